@@ -0,0 +1,152 @@
+"""
+Benchmarks of the longest palindrome algorithms.
+
+The three versions of Manacher's algorithm, the one over bytes, and a naive
+expand-around-center baseline, are run on several kinds of inputs of several sizes:
+the cleaned text of the bible, random 'ucga' strings, repetitive strings, and strings
+of a single character, the worst case of the baseline. For each case, the suite reports
+the best time per call of a few runs, the characters per second, and the peak memory
+traced during one call, and checks that all the algorithms find the same palindrome:
+
+    python bench_palindromes.py --sizes 1000 100000 --output results.json
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from random import Random
+
+sys.path.append(str(Path(__file__).parents[2]))  # for utils, when run from src
+
+from bible_to_string import BIBLE_PATH, get_bible_as_str
+from loop_invariants import longest_palindrome, longest_palindrome_2, longest_palindrome_everted, \
+    longest_palindrome_bytes
+from utils.benchmarking import calibrate, peak_bytes, time_calls
+
+
+def expand_around_center(s):
+    """The first longest palindrome of s, by expanding around each of the 2n + 1 centers, in O(n^2)."""
+    n = len(s)
+    best_start = best_length = 0
+    for ctr in range(2 * n + 1):
+        start, end = ctr >> 1, ctr + 1 >> 1  # s[start:end] is a palindrome centered at ctr
+        while 0 < start and end < n and s[start - 1] == s[end]:
+            start, end = start - 1, end + 1
+        if end - start > best_length:
+            best_start, best_length = start, end - start
+    return s[best_start:best_start + best_length]
+
+
+ALGORITHMS = {
+    'longest_palindrome': longest_palindrome,
+    'longest_palindrome_2': longest_palindrome_2,
+    'longest_palindrome_everted': longest_palindrome_everted,
+    'longest_palindrome_bytes': lambda s: longest_palindrome_bytes(s.encode('ascii')).decode('ascii'),
+    'expand_around_center': expand_around_center,
+}
+
+# (algorithm, input kind): the largest size it is run on. The baseline is quadratic on
+# inputs with long palindromes, and linear on random ones and on text.
+MAX_SIZE = {('expand_around_center', 'repetitive'): 20_000, ('expand_around_center', 'same'): 5_000}
+
+
+def make_input(kind, size, seed=0):
+    rng = Random(f'{kind}/{size}/{seed}')
+    if kind == 'bible':
+        text = get_bible_as_str()
+        return (text * (size // len(text) + 1))[:size]
+    if kind == 'random':
+        return ''.join(rng.choice('ucga') for _ in range(size))
+    if kind == 'repetitive':
+        # A random block repeated, with a few random changes
+        block = ''.join(rng.choice('ucga') for _ in range(rng.randrange(2, 12)))
+        s = list((block * (size // len(block) + 1))[:size])
+        for _ in range(size // 1000):
+            s[rng.randrange(size)] = rng.choice('ucga')
+        return ''.join(s)
+    if kind == 'same':
+        return 'a' * size
+    raise ValueError(f'unknown input kind: {kind!r}')
+
+
+INPUTS = ('bible', 'random', 'repetitive', 'same')
+
+
+def best_time(fn, s, repeat, min_time):
+    """The best time per call of repeat runs, each making as many calls as take at least min_time seconds."""
+    number, best = calibrate(fn, (s,), min_time=min_time)
+    for _ in range(repeat - 1):
+        best = min(best, time_calls(fn, (s,), number=number))
+    return best / number
+
+
+def run_case(kind, size, algorithms=tuple(ALGORITHMS), repeat=3, min_time=0.05):
+    """The results of each algorithm on one input, and whether they all found the same palindrome."""
+    s = make_input(kind, size)
+    results, palindromes = [], set()
+    for algorithm in algorithms:
+        if size > MAX_SIZE.get((algorithm, kind), size):
+            continue
+        fn = ALGORITHMS[algorithm]
+        palindrome = fn(s)
+        seconds = best_time(fn, s, repeat, min_time)
+        palindromes.add(palindrome)
+        results.append({
+            'input': kind,
+            'size': size,
+            'algorithm': algorithm,
+            'seconds': seconds,
+            'chars_per_sec': size / seconds if seconds else float('inf'),
+            'peak_bytes': peak_bytes(fn, (s,)),
+            'palindrome_length': len(palindrome),
+        })
+    return results, len(palindromes) <= 1
+
+
+def run_suite(inputs=INPUTS, sizes=(1000, 10_000, 100_000), algorithms=tuple(ALGORITHMS), repeat=3,
+              min_time=0.05, report=print):
+    results, disagreements = [], []
+    for kind in inputs:
+        if kind == 'bible' and not BIBLE_PATH.exists():
+            if report:
+                report(f'Skipping the bible: {BIBLE_PATH} not found')
+            continue
+        for size in sizes:
+            case, agree = run_case(kind, size, algorithms, repeat, min_time)
+            results.extend(case)
+            if not agree:
+                disagreements.append((kind, size))
+            if report:
+                for result in case:
+                    report(format_result(result))
+                if not agree:
+                    report(f'{kind} {size}: the algorithms disagree')
+    return results, disagreements
+
+
+def format_result(result):
+    return (f"{result['input']:>10} {result['size']:>9,d} {result['algorithm']:>26}: "
+            f"{result['seconds']:9.4f} s {result['chars_per_sec']:14,.0f} chars/s "
+            f"{result['peak_bytes']:13,d} peak bytes, palindrome of {result['palindrome_length']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the longest palindrome algorithms.')
+    parser.add_argument('--inputs', nargs='+', choices=INPUTS, default=list(INPUTS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10_000, 100_000],
+                        help='input sizes in characters')
+    parser.add_argument('--algorithms', nargs='+', choices=list(ALGORITHMS), default=list(ALGORITHMS))
+    parser.add_argument('--min-time', type=float, default=0.05, help='seconds per timing run')
+    parser.add_argument('--repeat', type=int, default=3, help='timing runs per case; the best is kept')
+    parser.add_argument('--output', help='save the results to this JSON file')
+    args = parser.parse_args(argv)
+
+    results, disagreements = run_suite(args.inputs, args.sizes, args.algorithms, args.repeat, args.min_time)
+    if args.output:
+        with open(args.output, mode='w') as f:
+            json.dump(results, f, indent=2)
+    return 1 if disagreements else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
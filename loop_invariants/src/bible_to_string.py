@@ -1,18 +1,65 @@
+import os
 import string
 from pathlib import Path
 
 BIBLE_PATH = Path(__file__).parent.parent / 'assets/bible.txt'
 ALPHABET = string.ascii_uppercase
 
+# Cleaning bytes: translate() deletes every byte that is not an ASCII letter, then
+# upper-cases the rest, at C speed
+_UPPER = bytes.maketrans(string.ascii_lowercase.encode(), ALPHABET.encode())
+_DELETE = bytes(b for b in range(256) if chr(b) not in string.ascii_letters)
+CHUNK_SIZE = 1 << 22
+
 
 def clean_line(line):
     return ''.join(c for c in line.upper() if c in ALPHABET)
 
 
-def get_bible_as_str():
-    with open(BIBLE_PATH, mode='r') as f:
-        s = ''.join(clean_line(line) for line in f)
-    return s
+def clean_bytes(data):
+    return data.translate(_UPPER, _DELETE)
+
+
+def iter_clean_chunks(path=BIBLE_PATH, chunk_size=CHUNK_SIZE):
+    """Yield the cleaned contents of the file at path, as bytes, one read chunk at a time."""
+    with open(path, mode='rb') as f:
+        while chunk := f.read(chunk_size):
+            yield chunk.translate(_UPPER, _DELETE)
+
+
+def _cache_path(path, cache_dir):
+    stat = os.stat(path)
+    return Path(cache_dir) / f'{Path(path).name}.{stat.st_mtime_ns}.{stat.st_size}.clean'
+
+
+def get_bible_as_bytes(path=BIBLE_PATH, cache_dir=None):
+    """
+    The cleaned contents of the file at path, as ASCII bytes. Unless cache_dir is False,
+    the result is cached in cache_dir (by default, the directory of path), in a file whose
+    name has the modification time and size of the source, so that an edited source is
+    cleaned again. If the cache cannot be written, the data is returned all the same.
+    """
+    if cache_dir is False:
+        return b''.join(iter_clean_chunks(path))
+    cache = _cache_path(path, cache_dir or Path(path).parent)
+    try:
+        return cache.read_bytes()
+    except OSError:
+        pass
+    data = b''.join(iter_clean_chunks(path))
+    tmp = cache.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        for stale in cache.parent.glob(f'{Path(path).name}.*.clean'):
+            stale.unlink(missing_ok=True)
+        tmp.write_bytes(data)
+        os.replace(tmp, cache)
+    except OSError:  # e.g. a read-only directory: the data is returned uncached
+        pass
+    return data
+
+
+def get_bible_as_str(path=BIBLE_PATH, cache_dir=None):
+    return get_bible_as_bytes(path, cache_dir).decode('ascii')
 
 
 if __name__ == '__main__':
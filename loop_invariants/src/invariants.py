@@ -0,0 +1,108 @@
+"""
+Loop invariants that are checked at run time, all the time, some of the time or never.
+
+A LoopInvariants holds named predicates over the state of a loop, which the loop
+passes as keyword arguments on each iteration:
+
+    invariants = LoopInvariants(sampling=every(100))
+    invariants.add('bounds', lambda lo, hi, **_: 0 <= lo <= hi)
+    while ...:
+        invariants.check(lo=lo, hi=hi)
+
+A sampling policy decides on which iterations a predicate is evaluated: never(),
+every(n) or with_probability(p). Each invariant counts its iterations, checks and
+failures, and the time spent evaluating it, so that the cost of the checks that are
+left on can be measured.
+"""
+from random import random
+from time import perf_counter
+
+
+class InvariantError(AssertionError):
+    pass
+
+
+def never():
+    return lambda iteration: False
+
+
+def every(n):
+    """Check on the first iteration and on every nth one after it."""
+    if n == 1:
+        return lambda iteration: True
+    return lambda iteration: iteration % n == 0
+
+
+def with_probability(p, rng=random):
+    return lambda iteration: rng() < p
+
+
+class Invariant:
+
+    def __init__(self, name, predicate, sampling):
+        self.name = name
+        self.predicate = predicate
+        self.sampling = sampling
+        self.iterations = 0
+        self.checks = 0
+        self.failures = 0
+        self.seconds = 0.0
+
+    def check(self, state, force=False):
+        """Whether the predicate holds for state, or None if it is not checked on this iteration."""
+        iteration = self.iterations
+        self.iterations += 1
+        if not (force or self.sampling(iteration)):
+            return None
+        start = perf_counter()
+        holds = self.predicate(**state)
+        self.seconds += perf_counter() - start
+        self.checks += 1
+        if not holds:
+            self.failures += 1
+        return holds
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'iterations': self.iterations,
+            'checks': self.checks,
+            'failures': self.failures,
+            'seconds': self.seconds,
+            'seconds_per_check': self.seconds / self.checks if self.checks else 0.0,
+        }
+
+
+class LoopInvariants:
+    """
+    The invariants of a loop. With raise_on_failure, a failing invariant raises an
+    InvariantError; otherwise it is only counted, for a run that must go on.
+    """
+
+    def __init__(self, sampling=None, raise_on_failure=True):
+        self.sampling = sampling or every(1)
+        self.raise_on_failure = raise_on_failure
+        self.invariants = []
+
+    def add(self, name, predicate, sampling=None):
+        """Declare an invariant, checked with its own sampling policy or the loop's."""
+        self.invariants.append(Invariant(name, predicate, sampling or self.sampling))
+        return self
+
+    def check(self, force=False, **state):
+        """Check the invariants due on this iteration, or all of them if force is true."""
+        for invariant in self.invariants:
+            if invariant.check(state, force) is False and self.raise_on_failure:
+                raise InvariantError(f'invariant {invariant.name!r} does not hold for {state}')
+
+    @property
+    def failures(self):
+        return sum(invariant.failures for invariant in self.invariants)
+
+    def report(self):
+        return [invariant.as_dict() for invariant in self.invariants]
+
+    def format_report(self):
+        return '\n'.join(f"{r['name']:>20}: {r['checks']:,d} checks in {r['iterations']:,d} iterations, "
+                         f"{r['failures']:,d} failures, {r['seconds_per_check'] * 1e6:.2f} µs per check"
+                         for r in self.report())
@@ -0,0 +1,128 @@
+"""
+Integer square roots: isqrt(n) is the largest integer whose square is at most n.
+
+- isqrt_bitwise finds the root one bit at a time, as int_sqrt does, in O(log n) steps
+  of additions and shifts.
+- isqrt_newton runs Newton's iteration from the square root of the leading bits of n,
+  computed in floating point, which is correct to about 50 bits, so that a few steps
+  suffice.
+- isqrt_karatsuba is Zimmermann's Karatsuba square root, which recursively takes the
+  square root of the upper half of n, and finishes with one division.
+
+isqrt picks by size between math.isqrt, which is written in C and is the fastest up to
+a few thousand bits, and the Karatsuba square root, which is about twice as fast as
+math.isqrt beyond 10,000 bits, because it does a single division of half the size.
+"""
+import math
+from math import sqrt
+
+import numpy as np
+
+# Operands of up to that many bits fit in a float with room to spare
+_FLOAT_BITS = 100
+# Below KARATSUBA_BASE bits, the Karatsuba square root hands over to math.isqrt, and
+# isqrt only uses it from KARATSUBA_THRESHOLD bits
+KARATSUBA_BASE = 2000
+KARATSUBA_THRESHOLD = 6000
+
+
+def isqrt_bitwise(n):
+    if n < 0:
+        raise ValueError('isqrt() argument must be nonnegative')
+    root, m, k, h = 0, n, 1, 0
+    while k <= n:
+        k <<= 2
+    while k > 1:
+        # k * root ** 2 + m == n and 0 <= m < k * (2 * root + 1) and k * root == h
+        k >>= 2
+        root <<= 1
+        d = h + k
+        h >>= 1
+        if d <= m:
+            m -= d
+            root += 1
+            h += k
+    return root
+
+
+def initial_guess(n):
+    """An integer no smaller than isqrt(n), and within about 2 ** -48 of it, relatively."""
+    shift = max(0, n.bit_length() - _FLOAT_BITS) >> 1
+    return int(sqrt(n >> 2 * shift) * (1 + 2 ** -48)) + 1 << shift
+
+
+def isqrt_newton(n, start=None):
+    if n < 0:
+        raise ValueError('isqrt() argument must be nonnegative')
+    if n == 0:
+        return 0
+    # From a start no smaller than the root, the iteration decreases until it reaches it
+    x = start or initial_guess(n)
+    while True:
+        y = (x + n // x) >> 1
+        if y >= x:
+            return x
+        x = y
+
+
+def sqrtrem(n):
+    """The square root and the remainder of n, (s, n - s * s), by Karatsuba square root."""
+    if n < 0:
+        raise ValueError('isqrt() argument must be nonnegative')
+    if n.bit_length() <= KARATSUBA_BASE:
+        s = math.isqrt(n)
+        return s, n - s * s
+    # Shifts n by an even number of bits, so that it has 4k - 1 or 4k bits, and
+    # splits it in four k-bit limbs, a3 b^3 + a2 b^2 + a1 b + a0, where b = 2^k. Its
+    # leading limb is then at least b / 4, as the algorithm needs.
+    k = (n.bit_length() + 3) >> 2
+    t = (4 * k - n.bit_length()) >> 1
+    m = n << 2 * t
+    mask = (1 << k) - 1
+    a0, a1 = m & mask, (m >> k) & mask
+    s1, r1 = sqrtrem(m >> 2 * k)
+    q, u = divmod((r1 << k) + a1, s1 << 1)
+    s = (s1 << k) + q
+    r = (u << k) + a0 - q * q
+    if r < 0:
+        r += (s << 1) - 1
+        s -= 1
+    if t:
+        # The root of n is that of m shifted back; its remainder is recomputed
+        s >>= t
+        r = n - s * s
+    return s, r
+
+
+def isqrt_karatsuba(n):
+    return sqrtrem(n)[0]
+
+
+METHODS = {
+    'bitwise': isqrt_bitwise,
+    'newton': isqrt_newton,
+    'karatsuba': isqrt_karatsuba,
+    'builtin': math.isqrt,
+}
+
+
+def isqrt(n, method=None):
+    """The integer square root of n, by the given method, or the one that is fastest for its size."""
+    if method is not None:
+        return METHODS[method](n)
+    if n.bit_length() <= KARATSUBA_THRESHOLD:
+        return math.isqrt(n)
+    return sqrtrem(n)[0]
+
+
+def isqrt_uint64(a):
+    """The integer square roots of an array of non-negative integers of up to 64 bits, as uint64."""
+    a = np.asarray(a, dtype=np.uint64)
+    # The float square root is off by at most one, because a is rounded to 53 bits
+    r = np.sqrt(a.astype(np.float64)).astype(np.uint64)
+    r = np.minimum(r, np.uint64(0xFFFFFFFF))
+    r -= (r * r > a).astype(np.uint64)
+    below = r < np.uint64(0xFFFFFFFF)
+    r1 = r + np.uint64(1)
+    r += (below & (r1 * r1 <= a)).astype(np.uint64)
+    return r
@@ -1,6 +1,10 @@
+import mmap
+from array import array
 from collections import defaultdict, Counter
 from random import choice
 from bible_to_string import get_bible_as_str
+from invariants import LoopInvariants
+from isqrt import initial_guess
 
 
 def mystery(n):
@@ -18,17 +22,34 @@ def mystery(n):
     return c, a
 
 
-def int_sqrt(n):
+def int_sqrt_invariants(sampling=None, raise_on_failure=True):
+    """The loop invariants of int_sqrt, checked as often as sampling says, by default on each iteration."""
+    return (LoopInvariants(sampling, raise_on_failure)
+            .add('square', lambda n, root, m, k, h: k * root ** 2 + m == n)
+            .add('remainder', lambda n, root, m, k, h: 0 <= m < k * (2 * root + 1))
+            .add('h', lambda n, root, m, k, h: k * root == h))
+
+
+def int_sqrt(n, debug=False, invariants=None):
+    """
+    The integer square root of n and the remainder. The loop invariants are checked
+    when invariants, from int_sqrt_invariants, is given, as often as its sampling says.
+    With debug=True, the state is also printed, and by default checked on each iteration.
+    """
     root, m, k, h = 0, n, 1, 0
     while k <= n:
         k <<= 2
+    if debug and invariants is None:
+        invariants = int_sqrt_invariants()
 
-    def invariant():
-        print(f'root = {root:3d}, m = {m:3d}, k = {k:4d}, h = {h:3d}')
-        return k * root ** 2 + m == n and 0 <= m < k * (2 * root + 1) and k * root == h
+    def invariant(force=False):
+        if debug:
+            print(f'root = {root:3d}, m = {m:3d}, k = {k:4d}, h = {h:3d}')
+        if invariants is not None:
+            invariants.check(force, n=n, root=root, m=m, k=k, h=h)
 
     while k > 1:
-        assert invariant()
+        invariant()
         k >>= 2
         root <<= 1
         d = h + k  # d == k * (2 * root + 1)
@@ -37,7 +58,8 @@ def int_sqrt(n):
             m -= d
             root += 1
             h += k
-    assert invariant() and k == 1
+    # On exit, k == 1, so the invariants say that root is the square root of n
+    invariant(force=True)
     return root, m
 
 
@@ -46,7 +68,7 @@ def int_sqrt(n):
 ######################################################################
 
 def int_sqrt_newton(n, start=None):
-    guess = start or 1 << n.bit_length() // 2
+    guess = start or initial_guess(n)
     y = n // guess
     while abs(guess - y) > 1:
         guess = (guess + y) >> 1
@@ -142,8 +164,58 @@ def longest_palindrome_everted(s):
     return s[max_j - r[max_j] >> 1:max_j + r[max_j] >> 1]
 
 
+def radius_array(n):
+    """A zeroed array of n radii, of 4 bytes each unless the radii may need 8."""
+    r = array('I' if n < 1 << 32 else 'Q')
+    r.frombytes(bytes(n * r.itemsize))
+    return r
+
+
+def longest_palindrome_bytes(s, return_radii=False):
+    """
+    longest_palindrome for a bytes-like sequence s, such as bytes, bytearray or mmap,
+    with the radii in an array of 4-byte integers instead of a list of ints. Returns
+    the longest palindromic substring, as bytes, and if return_radii is true, the array
+    r too, where r[k] is the radius of the longest palindrome of s_sep centered at k, so
+    that s[k - r[k] >> 1: k + r[k] >> 1] is the longest palindrome centered at k.
+    """
+    # s_sep = '|' + '|'.join(s) + '|'
+    n = 2 * len(s) + 1
+    r = radius_array(n)
+    start = max_ctr = ctr = end = 0
+    while end < n - 1:
+        # Same loop invariant as in longest_palindrome
+        i, j = ctr - 1, ctr + 1
+        while j <= end and r[i] != end - j:
+            r[j] = min(r[i], end - j)
+            i, j = i - 1, j + 1
+        ctr, end = j, max(end, j)
+        start = ctr - (end - ctr)
+        while start & 1 or 0 < start and end < n - 1 and s[(start >> 1) - 1] == s[end >> 1]:
+            start, end = start - 1, end + 1
+        r[ctr] = end - ctr
+        if r[ctr] > r[max_ctr]: max_ctr = ctr
+    p = bytes(s[max_ctr - r[max_ctr] >> 1: max_ctr + r[max_ctr] >> 1])
+    if not return_radii:
+        return p
+    # The loop stops when a palindrome reaches the end. The radii to the right of its
+    # center mirror those to the left, cut at the end.
+    for j in range(ctr + 1, n):
+        r[j] = min(r[2 * ctr - j], n - 1 - j)
+    return p, r
+
+
+def longest_palindrome_in_file(path, return_radii=False):
+    """longest_palindrome_bytes over the memory-mapped contents of the file at path."""
+    with open(path, mode='rb') as f:
+        if f.seek(0, 2) == 0:
+            return longest_palindrome_bytes(b'', return_radii)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            return longest_palindrome_bytes(m, return_radii)
+
+
 if __name__ == "__main__":
-    int_sqrt(5000)
+    int_sqrt(5000, debug=True)
     print([(i, *mystery(i)) for i in range(5, 101, 5)])
     d = defaultdict(int)
     for _ in range(100):
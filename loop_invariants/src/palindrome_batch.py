@@ -0,0 +1,96 @@
+import os
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from random import choice
+import loop_invariants
+
+ALGORITHMS = ('longest_palindrome', 'longest_palindrome_2', 'longest_palindrome_everted')
+
+
+def _longest_in_chunk(chunk, algorithm, return_palindromes):
+    # Runs in a worker: only positions go back to the parent, unless palindromes are asked for
+    longest = getattr(loop_invariants, algorithm)
+    results = []
+    for index, s in chunk:
+        p = longest(s)
+        # The first occurrence of p is the first longest palindrome
+        start = s.find(p)
+        results.append((index, start, start + len(p), p) if return_palindromes else
+                       (index, start, start + len(p)))
+    return results
+
+
+def _histogram_of_chunk(chunk, algorithm):
+    longest = getattr(loop_invariants, algorithm)
+    return Counter(len(longest(s)) for _, s in chunk)
+
+
+def _chunks(strings, chunk_size):
+    records = enumerate(strings)
+    while chunk := list(islice(records, chunk_size)):
+        yield chunk
+
+
+def _completed(pending, ordered):
+    # The results of the oldest pending future, or of the first ones to complete
+    if ordered:
+        return [pending.popleft().result()]
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        pending.remove(future)
+    return [future.result() for future in done]
+
+
+def _map_chunks(fn, strings, args, workers, chunk_size, ordered):
+    # Submits chunks of (index, string) to a process pool, keeping at most two chunks per
+    # worker in flight, so that an unbounded iterable of strings is not read far ahead,
+    # and yields the results of each chunk in order of submission, or as they complete
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(workers) as executor:
+        pending = deque()
+        for chunk in _chunks(strings, chunk_size):
+            pending.append(executor.submit(fn, chunk, *args))
+            if len(pending) >= 2 * workers:
+                yield from _completed(pending, ordered)
+        while pending:
+            yield from _completed(pending, ordered)
+
+
+def batch_longest_palindromes(strings, algorithm='longest_palindrome', *, workers=None, chunk_size=16,
+                              ordered=True, return_palindromes=False):
+    """
+    Find the longest palindrome of each string of an iterable, over a pool of processes.
+    Yields (index, start, stop) for each string, where index is its position in the
+    iterable and s[start:stop] its first longest palindrome, followed by the palindrome
+    itself if return_palindromes is true. With ordered=False, the results of a chunk of
+    strings are yielded as soon as it is done, so indices may come out of order.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f'unknown algorithm: {algorithm!r}')
+    for results in _map_chunks(_longest_in_chunk, strings, (algorithm, return_palindromes),
+                               workers, chunk_size, ordered):
+        yield from results
+
+
+def batch_length_histogram(strings, algorithm='longest_palindrome', *, workers=None, chunk_size=16):
+    """The number of strings of an iterable by length of their longest palindrome, counted in the workers."""
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f'unknown algorithm: {algorithm!r}')
+    histogram = Counter()
+    for counts in _map_chunks(_histogram_of_chunk, strings, (algorithm,), workers, chunk_size, False):
+        histogram.update(counts)
+    return histogram
+
+
+def read_records(path):
+    """The non-empty lines of a text file, one record per line."""
+    with open(path) as f:
+        for line in f:
+            if record := line.strip():
+                yield record
+
+
+if __name__ == "__main__":
+    strings = (''.join(choice('ucga') for _ in range(100000)) for _ in range(100))
+    print(sorted(batch_length_histogram(strings).items()))
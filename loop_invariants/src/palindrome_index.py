@@ -0,0 +1,187 @@
+from array import array
+from loop_invariants import longest_palindrome_bytes
+
+
+class PalindromeIndex:
+    """
+    An index of the palindromes of a text, for answering many questions about them.
+
+    The index is built on the radii computed by longest_palindrome_bytes: r[k] is the
+    radius of the longest palindrome of s_sep = '|' + '|'.join(s) + '|' centered at k,
+    which is also the length of the longest palindrome of s centered there. Palindromes
+    of odd length are centered at odd k, those of even length at even k.
+
+    Two more structures are built the first time they are needed, in O(n log n) and O(n):
+    - a sparse table over the radii of each parity, for the longest palindrome in a range;
+    - a palindromic tree (eertree), for the distinct palindromes and their counts.
+    All of them are kept in arrays rather than lists of ints or node objects.
+
+    s is bytes-like, or a str of single-byte characters.
+    """
+
+    def __init__(self, s):
+        self.s = s.encode('latin-1') if isinstance(s, str) else s
+        _, self.radii = longest_palindrome_bytes(self.s, return_radii=True)
+        self._tables = None
+        self._tree = None
+
+    def __len__(self):
+        return len(self.s)
+
+    def longest(self):
+        """The (start, stop) of the first longest palindrome."""
+        return self.longest_in(0, len(self.s))
+
+    ##################
+    # Range queries  #
+    ##################
+
+    def _build_tables(self):
+        # For each parity p, levels[j][i] is the index of the largest radius among the
+        # radii at p + 2 * i, ..., p + 2 * (i + 2 ** j - 1), the leftmost one on ties
+        r = self.radii
+        # Indices into the radii, as wide as the radii themselves, see radius_array
+        typecode = 'I' if len(r) < 1 << 32 else 'Q'
+        tables = []
+        for parity in (0, 1):
+            level = array(typecode, range(parity, len(r), 2))
+            levels = [level]
+            width = 1
+            while 2 * width <= len(levels[0]):
+                prev = level
+                level = array(typecode, (a if r[a] >= r[b] else b for a, b in zip(prev, prev[width:])))
+                levels.append(level)
+                width *= 2
+            tables.append(levels)
+        self._tables = tables
+
+    def _argmax(self, lo, hi):
+        # The index of the largest radius among r[lo:hi + 1:2], for lo <= hi of the same parity
+        if self._tables is None:
+            self._build_tables()
+        levels = self._tables[lo & 1]
+        i, j = lo >> 1, hi >> 1
+        level = (j - i + 1).bit_length() - 1
+        a, b = levels[level][i], levels[level][j - (1 << level) + 1]
+        return a if self.radii[a] >= self.radii[b] else b
+
+    def _fits(self, lo, hi, length):
+        # Whether a palindrome of that length fits in s[lo:hi]. It is centered at some k
+        # of the parity of length, with 2 * lo + length <= k <= 2 * hi - length.
+        first, last = 2 * lo + length, 2 * hi - length
+        return first <= last and self.radii[self._argmax(first, last)] >= length
+
+    def _longest_length(self, lo, hi, parity):
+        # The length of the longest palindrome in s[lo:hi] of the given parity, by binary
+        # search: when a length fits, so does that length minus 2.
+        low, high = 1 - parity, (hi - lo - parity) // 2
+        while low <= high:
+            m = (low + high + 1) // 2
+            if self._fits(lo, hi, parity + 2 * m):
+                low = m + 1
+            else:
+                high = m - 1
+        return parity + 2 * high
+
+    def longest_in(self, lo, hi):
+        """The (start, stop) of the longest palindrome in s[lo:hi], the first one on ties."""
+        lo, hi, _ = slice(lo, hi).indices(len(self.s))
+        if hi <= lo:
+            return lo, lo
+        length = max(self._longest_length(lo, hi, 0), self._longest_length(lo, hi, 1))
+        # The leftmost center where it fits, by binary search on the last center looked at
+        first, last = 2 * lo + length, 2 * hi - length
+        while first < last:
+            mid = first + ((last - first) >> 2 << 1)
+            if self.radii[self._argmax(2 * lo + length, mid)] >= length:
+                last = mid
+            else:
+                first = mid + 2
+        start = first - length >> 1
+        return start, start + length
+
+    ##################
+    # Occurrences    #
+    ##################
+
+    def maximal_palindromes(self, min_length=1):
+        """The (start, stop) of the longest palindrome at each center, if it has at least min_length characters."""
+        r = self.radii
+        min_length = max(min_length, 1)
+        for k in range(len(r)):
+            if r[k] >= min_length:
+                start = k - r[k] >> 1
+                yield start, start + r[k]
+
+    def occurrences(self, min_length=1):
+        """The (start, stop) of every occurrence of a palindrome of at least min_length characters."""
+        min_length = max(min_length, 1)
+        for start, stop in self.maximal_palindromes(min_length):
+            while stop - start >= min_length:
+                yield start, stop
+                start, stop = start + 1, stop - 1
+
+    def count_occurrences(self, min_length=1):
+        """The number of occurrences of palindromes of at least min_length characters."""
+        total = 0
+        min_length = max(min_length, 1)
+        for length in self.radii:
+            if length >= min_length:
+                total += (length - min_length) // 2 + 1
+        return total
+
+    ##################
+    # Eertree        #
+    ##################
+
+    def _build_tree(self):
+        # Node 0 is the root of odd palindromes, of length -1, node 1 that of even ones,
+        # of length 0. Edges are keyed by node << 8 | byte in a single dict.
+        s = self.s
+        length = array('q', [-1, 0])
+        link = array('q', [0, 0])
+        end = array('q', [0, 0])
+        count = array('q', [0, 0])
+        edges = {}
+        last = 1
+        for i in range(len(s)):
+            c = s[i]  # an int, also when s is an mmap, whose iterator yields bytes
+            cur = last
+            while i - 1 - length[cur] < 0 or s[i - 1 - length[cur]] != c:
+                cur = link[cur]
+            key = cur << 8 | c
+            node = edges.get(key)
+            if node is None:
+                node = len(length)
+                length.append(length[cur] + 2)
+                end.append(i)
+                count.append(0)
+                if length[node] == 1:
+                    link.append(1)
+                else:
+                    w = link[cur]
+                    while i - 1 - length[w] < 0 or s[i - 1 - length[w]] != c:
+                        w = link[w]
+                    link.append(edges[w << 8 | c])
+                edges[key] = node
+            count[node] += 1
+            last = node
+        # Each occurrence of a palindrome is also one of its longest proper palindromic suffix
+        for node in range(len(length) - 1, 1, -1):
+            count[link[node]] += count[node]
+        self._tree = length, end, count
+
+    def distinct_count(self):
+        """The number of distinct palindromic substrings."""
+        if self._tree is None:
+            self._build_tree()
+        return len(self._tree[0]) - 2
+
+    def distinct_palindromes(self, min_length=1):
+        """The distinct palindromes of at least min_length characters, as (palindrome, number of occurrences)."""
+        if self._tree is None:
+            self._build_tree()
+        length, end, count = self._tree
+        for node in range(2, len(length)):
+            if length[node] >= min_length:
+                yield bytes(self.s[end[node] - length[node] + 1: end[node] + 1]), count[node]
@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+from random import Random
+import sys
+
+import pytest
+
+SRC_DIR = Path(__file__).parent.parent / 'src'
+sys.path.append(str(SRC_DIR))
+
+from bench_palindromes import ALGORITHMS, MAX_SIZE, expand_around_center, main, make_input, run_case, run_suite
+from loop_invariants import longest_palindrome
+
+
+def test_expand_around_center():
+    rng = Random(6)
+    for _ in range(200):
+        s = ''.join(rng.choice('ab') for _ in range(rng.randrange(40)))
+        assert expand_around_center(s) == longest_palindrome(s)
+
+
+@pytest.mark.parametrize('kind', ['random', 'repetitive', 'same'])
+def test_inputs(kind):
+    s = make_input(kind, 500)
+    assert len(s) == 500
+    assert make_input(kind, 500) == s
+
+
+def test_run_case():
+    results, agree = run_case('repetitive', 300, repeat=1)
+    assert agree
+    assert [r['algorithm'] for r in results] == list(ALGORITHMS)
+    for r in results:
+        assert r['chars_per_sec'] > 0 and r['peak_bytes'] >= 0
+
+
+def test_baseline_is_capped_by_input_kind():
+    size = MAX_SIZE['expand_around_center', 'same'] + 1
+    algorithms = ['longest_palindrome', 'expand_around_center']
+    same, _ = run_case('same', size, algorithms, repeat=1, min_time=0)
+    random, _ = run_case('random', size, algorithms, repeat=1, min_time=0)
+    assert [r['algorithm'] for r in same] == ['longest_palindrome']
+    assert [r['algorithm'] for r in random] == algorithms
+
+
+def test_disagreement_is_reported(monkeypatch):
+    monkeypatch.setitem(ALGORITHMS, 'wrong', lambda s: s[:1])
+    results, disagreements = run_suite(['same'], [50], ['longest_palindrome', 'wrong'], repeat=1, report=None)
+    assert disagreements == [('same', 50)]
+
+
+def test_main(tmp_path, capsys):
+    output = tmp_path / 'results.json'
+    assert main(['--inputs', 'random', 'same', '--sizes', '100', '--repeat', '1', '--output', str(output)]) == 0
+    results = json.loads(output.read_text())
+    assert len(results) == 2 * len(ALGORITHMS)
+    assert 'chars/s' in capsys.readouterr().out
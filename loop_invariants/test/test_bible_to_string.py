@@ -0,0 +1,64 @@
+from pathlib import Path
+import os
+import sys
+
+SRC_DIR = Path(__file__).parent.parent / 'src'
+sys.path.append(str(SRC_DIR))
+
+from bible_to_string import *
+
+TEXT = "In the beginning God created the heaven and the earth.\n\t1:2 And the earth was without form; été 42\n"
+
+
+def test_clean_bytes_agrees_with_clean_line():
+    expected = ''.join(clean_line(line) for line in TEXT.splitlines(keepends=True))
+    assert clean_bytes(TEXT.encode()).decode('ascii') == expected
+
+
+def test_chunks(tmp_path):
+    path = tmp_path / 'bible.txt'
+    path.write_text(TEXT * 100)
+    chunks = list(iter_clean_chunks(path, chunk_size=7))
+    assert len(chunks) > 1
+    assert b''.join(chunks) == clean_bytes((TEXT * 100).encode())
+
+
+def test_cache(tmp_path):
+    path = tmp_path / 'bible.txt'
+    path.write_text(TEXT)
+    s = get_bible_as_str(path)
+    assert s == clean_bytes(TEXT.encode()).decode()
+    caches = list(tmp_path.glob('bible.txt.*.clean'))
+    assert len(caches) == 1
+    caches[0].write_bytes(b'CACHED')
+    assert get_bible_as_str(path) == 'CACHED'
+    assert get_bible_as_str(path, cache_dir=False) == s
+    # Editing the source invalidates the cache
+    path.write_text('Amen.')
+    os.utime(path, ns=(0, 10 ** 9))
+    assert get_bible_as_str(path) == 'AMEN'
+    assert len(list(tmp_path.glob('bible.txt.*.clean'))) == 1
+
+
+def test_cache_dir(tmp_path):
+    path = tmp_path / 'bible.txt'
+    path.write_text(TEXT)
+    cache_dir = tmp_path / 'cache'
+    cache_dir.mkdir()
+    get_bible_as_bytes(path, cache_dir)
+    assert len(list(cache_dir.glob('*.clean'))) == 1
+
+
+def test_cache_cannot_be_written(tmp_path, monkeypatch):
+    path = tmp_path / 'bible.txt'
+    path.write_text(TEXT)
+    expected = clean_bytes(TEXT.encode())
+    assert get_bible_as_bytes(path, tmp_path / 'missing') == expected
+
+    def read_only(*args, **kwargs):
+        raise PermissionError('read-only file system')
+
+    monkeypatch.setattr(Path, 'write_bytes', read_only)
+    monkeypatch.setattr(Path, 'unlink', read_only)
+    assert get_bible_as_str(path) == expected.decode()
+    assert list(tmp_path.glob('*.clean')) == []
@@ -0,0 +1,58 @@
+from pathlib import Path
+from random import Random
+import sys
+
+import pytest
+
+SRC_DIR = Path(__file__).parent.parent / 'src'
+sys.path.append(str(SRC_DIR))
+
+from invariants import *
+
+
+def sum_loop(values, invariants):
+    total = 0
+    for i, x in enumerate(values):
+        invariants.check(i=i, total=total, values=values)
+        total += x
+    return total
+
+
+def test_sampling_policies():
+    assert [i for i in range(10) if every(3)(i)] == [0, 3, 6, 9]
+    assert all(every(1)(i) for i in range(10))
+    assert not any(never()(i) for i in range(10))
+    rng = Random(1)
+    sampled = sum(with_probability(0.25, rng.random)(i) for i in range(10_000))
+    assert 2300 < sampled < 2700
+
+
+def test_checks_are_counted():
+    invariants = (LoopInvariants(every(4))
+                  .add('partial sum', lambda i, total, values: total == sum(values[:i]))
+                  .add('index', lambda i, total, values: 0 <= i < len(values), sampling=never()))
+    assert sum_loop(list(range(10)), invariants) == 45
+    partial_sum, index = invariants.report()
+    assert partial_sum['iterations'] == index['iterations'] == 10
+    assert (partial_sum['checks'], index['checks']) == (3, 0)
+    assert partial_sum['seconds'] > 0
+    assert invariants.failures == 0
+    assert 'partial sum' in invariants.format_report()
+
+
+def test_failures():
+    invariants = LoopInvariants().add('small', lambda i, **_: i < 5)
+    with pytest.raises(InvariantError, match="'small'"):
+        sum_loop(list(range(10)), invariants)
+    assert invariants.failures == 1
+
+    invariants = LoopInvariants(raise_on_failure=False).add('small', lambda i, **_: i < 5)
+    assert sum_loop(list(range(10)), invariants) == 45
+    assert invariants.failures == 5
+
+
+def test_forced_check():
+    invariants = LoopInvariants(never()).add('positive', lambda x: x > 0)
+    invariants.check(x=-1)
+    with pytest.raises(InvariantError):
+        invariants.check(force=True, x=-1)
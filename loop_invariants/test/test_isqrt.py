@@ -0,0 +1,50 @@
+from math import isqrt as expected
+from pathlib import Path
+from random import Random
+import sys
+
+import numpy as np
+import pytest
+
+SRC_DIR = Path(__file__).parent.parent / 'src'
+sys.path.append(str(SRC_DIR))
+
+from isqrt import *
+
+RNG = Random(4)
+NUMBERS = list(range(300)) + [4 ** k + d for k in range(1, 80) for d in (-1, 0, 1)] + \
+          [RNG.getrandbits(RNG.randrange(1, 30_000)) for _ in range(100)]
+
+
+@pytest.mark.parametrize('method', [None] + list(METHODS))
+def test_isqrt(method):
+    for n in NUMBERS:
+        if method == 'bitwise' and n.bit_length() > 5000:
+            continue
+        assert isqrt(n, method) == expected(n), n
+
+
+def test_sqrtrem():
+    for n in NUMBERS:
+        s, r = sqrtrem(n)
+        assert s == expected(n) and r == n - s * s
+
+
+def test_initial_guess():
+    for n in NUMBERS[1:]:
+        assert 0 <= initial_guess(n) - expected(n) <= (expected(n) >> 40) + 2
+
+
+@pytest.mark.parametrize('isqrt_function', [isqrt_bitwise, isqrt_newton, sqrtrem])
+def test_negative(isqrt_function):
+    with pytest.raises(ValueError):
+        isqrt_function(-1)
+
+
+def test_isqrt_uint64():
+    values = [0, 1, 2, 3, 15, 16, 2 ** 52 - 1, 2 ** 53 + 1, 2 ** 63, 2 ** 64 - 1,
+              (2 ** 32 - 1) ** 2, (2 ** 32 - 1) ** 2 - 1, (2 ** 31) ** 2 - 1]
+    values += [(x * x + d) % 2 ** 64 for x in (RNG.getrandbits(32) for _ in range(1000)) for d in (-1, 0, 1)]
+    roots = isqrt_uint64(np.array(values, dtype=np.uint64))
+    assert roots.dtype == np.uint64
+    assert roots.tolist() == [expected(v) for v in values]
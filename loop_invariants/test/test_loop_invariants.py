@@ -0,0 +1,59 @@
+from math import isqrt
+from pathlib import Path
+from random import Random
+import sys
+
+import pytest
+
+SRC_DIR = Path(__file__).parent.parent / 'src'
+sys.path.append(str(SRC_DIR))
+
+from invariants import every
+from loop_invariants import *
+
+
+def random_strings(count=50, seed=1):
+    rng = Random(seed)
+    return [''.join(rng.choice('ucga') for _ in range(rng.randrange(200))) for _ in range(count)]
+
+
+@pytest.mark.parametrize('s', random_strings() + ['', 'a', 'aa', 'ab', 'abacabad', 'xyzzyx'])
+def test_longest_palindrome_bytes(s):
+    p, r = longest_palindrome_bytes(s.encode(), return_radii=True)
+    assert p.decode() == longest_palindrome(s)
+    assert len(r) == 2 * len(s) + 1
+    assert max(r, default=0) == len(p)
+    for k in range(len(r)):
+        start, stop = k - r[k] >> 1, k + r[k] >> 1
+        assert s[start:stop] == s[start:stop][::-1]
+        # The palindrome is the longest one centered at k
+        assert start == 0 or stop == len(s) or s[start - 1] != s[stop]
+
+
+def test_longest_palindrome_in_file(tmp_path):
+    path = tmp_path / 'genome.txt'
+    path.write_bytes(b'ucgaacgguggcaagc')
+    assert longest_palindrome_in_file(path) == longest_palindrome('ucgaacgguggcaagc').encode()
+    path.write_bytes(b'')
+    assert longest_palindrome_in_file(path) == b''
+
+
+def test_int_sqrt(capsys):
+    for n in range(200):
+        assert int_sqrt(n) == (isqrt(n), n - isqrt(n) ** 2)
+        assert int_sqrt_newton(n + 1) == isqrt(n + 1)
+    assert capsys.readouterr().out == ''
+    assert int_sqrt(5000, debug=True) == (70, 100)
+    assert 'root =  70, m = 100, k =    1' in capsys.readouterr().out
+
+
+def test_int_sqrt_invariants():
+    invariants = int_sqrt_invariants(every(3))
+    for n in range(1000):
+        int_sqrt(n, invariants=invariants)
+    report = {r['name']: r for r in invariants.report()}
+    assert set(report) == {'square', 'remainder', 'h'}
+    for r in report.values():
+        assert r['failures'] == 0
+        # A third of the iterations are sampled, and the check on exit is forced
+        assert r['iterations'] / 3 <= r['checks'] <= r['iterations'] / 3 + 1000 + 1
@@ -0,0 +1,44 @@
+from collections import Counter
+from pathlib import Path
+from random import Random
+import sys
+
+import pytest
+
+SRC_DIR = Path(__file__).parent.parent / 'src'
+sys.path.append(str(SRC_DIR))
+
+from loop_invariants import longest_palindrome
+from palindrome_batch import batch_length_histogram, batch_longest_palindromes, read_records
+
+RNG = Random(2)
+STRINGS = [''.join(RNG.choice('ucga') for _ in range(RNG.randrange(1, 300))) for _ in range(50)]
+
+
+@pytest.mark.parametrize('algorithm', ['longest_palindrome', 'longest_palindrome_2', 'longest_palindrome_everted'])
+def test_ordered(algorithm):
+    results = list(batch_longest_palindromes(iter(STRINGS), algorithm, workers=2, chunk_size=3))
+    assert [index for index, _, _ in results] == list(range(len(STRINGS)))
+    for (_, start, stop), s in zip(results, STRINGS):
+        assert s[start:stop] == longest_palindrome(s)
+
+
+def test_unordered_with_palindromes():
+    results = list(batch_longest_palindromes(STRINGS, workers=2, chunk_size=4, ordered=False,
+                                             return_palindromes=True))
+    assert sorted(index for index, *_ in results) == list(range(len(STRINGS)))
+    for index, start, stop, p in results:
+        assert p == STRINGS[index][start:stop] == longest_palindrome(STRINGS[index])
+
+
+def test_histogram(tmp_path):
+    expected = Counter(len(longest_palindrome(s)) for s in STRINGS)
+    assert batch_length_histogram(STRINGS, workers=2, chunk_size=5) == expected
+    path = tmp_path / 'records.txt'
+    path.write_text('\n'.join(STRINGS) + '\n\n')
+    assert batch_length_histogram(read_records(path), workers=2) == expected
+
+
+def test_unknown_algorithm():
+    with pytest.raises(ValueError):
+        list(batch_longest_palindromes(STRINGS, 'mystery'))
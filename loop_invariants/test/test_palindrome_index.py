@@ -0,0 +1,65 @@
+from collections import Counter
+from pathlib import Path
+from random import Random
+import sys
+
+import pytest
+
+SRC_DIR = Path(__file__).parent.parent / 'src'
+sys.path.append(str(SRC_DIR))
+
+from loop_invariants import longest_palindrome
+from palindrome_index import PalindromeIndex
+
+
+def all_palindromes(s):
+    return [(i, j) for i in range(len(s)) for j in range(i + 1, len(s) + 1) if s[i:j] == s[i:j][::-1]]
+
+
+def random_string(rng, alphabet='ucga', max_length=60):
+    return ''.join(rng.choice(alphabet) for _ in range(rng.randrange(max_length)))
+
+
+STRINGS = ['', 'a', 'aaaa', 'abacabad', 'xyzzyxab'] + [random_string(Random(seed), 'ab') for seed in range(10)]
+
+
+@pytest.mark.parametrize('s', STRINGS)
+def test_longest_in(s):
+    index = PalindromeIndex(s)
+    start, stop = index.longest()
+    assert s[start:stop] == longest_palindrome(s)
+    for lo in range(len(s) + 1):
+        for hi in range(lo, len(s) + 1):
+            start, stop = index.longest_in(lo, hi)
+            assert lo <= start <= stop <= hi
+            assert s[start:stop] == longest_palindrome(s[lo:hi])
+
+
+@pytest.mark.parametrize('s', STRINGS)
+def test_occurrences(s):
+    index = PalindromeIndex(s)
+    palindromes = all_palindromes(s)
+    for min_length in range(0, 6):
+        expected = sorted(p for p in palindromes if p[1] - p[0] >= min_length)
+        assert sorted(index.occurrences(min_length)) == expected
+        assert index.count_occurrences(min_length) == len(expected)
+
+
+@pytest.mark.parametrize('s', STRINGS)
+def test_distinct_palindromes(s):
+    index = PalindromeIndex(s)
+    counts = Counter(s[i:j].encode() for i, j in all_palindromes(s))
+    assert index.distinct_count() == len(counts)
+    assert dict(index.distinct_palindromes()) == counts
+    assert dict(index.distinct_palindromes(3)) == {p: c for p, c in counts.items() if len(p) >= 3}
+
+
+def test_mmap(tmp_path):
+    import mmap
+    path = tmp_path / 'genome.txt'
+    s = random_string(Random(3), max_length=500)
+    path.write_bytes(s.encode())
+    with open(path, mode='rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        index = PalindromeIndex(m)
+        assert index.distinct_count() == PalindromeIndex(s).distinct_count()
+        assert index.longest_in(10, 100) == PalindromeIndex(s).longest_in(10, 100)
@@ -0,0 +1,189 @@
+"""
+Benchmarks of the StrNum backends against Python's int.
+
+Every operator is timed for operands of several sizes (in decimal digits) and every
+combination of signs. For each case, the suite reports the number of operations per
+second, the number of memory blocks that each operation retains (its result and
+anything it holds on to), and the peak memory used by one operation, which accounts for
+its temporaries. Python offers no count of the blocks that are allocated and freed
+again during a call, so the churn of temporaries only shows in the peak. Results can
+be saved as JSON and compared with those of an earlier run:
+
+    python -m strmath.src.bench_strmath --output before.json
+    python -m strmath.src.bench_strmath --compare before.json
+"""
+import argparse
+import gc
+import json
+import sys
+from itertools import product
+from random import Random
+
+from strmath.src.strmath import StrNum, IntNum, BigNum
+from utils.benchmarking import calibrate, peak_bytes, time_calls
+
+BACKENDS = {'int': int, 'str': StrNum, 'intnum': IntNum, 'bignum': BigNum}
+
+# name: (number of operands, function)
+OPERATORS = {
+    '+': (2, lambda a, b: a + b),
+    '-': (2, lambda a, b: a - b),
+    '*': (2, lambda a, b: a * b),
+    '//': (2, lambda a, b: a // b),
+    '%': (2, lambda a, b: a % b),
+    'divmod': (2, divmod),
+    '<<': (2, lambda a, b: a << b),
+    '>>': (2, lambda a, b: a >> b),
+    '&': (2, lambda a, b: a & b),
+    '<': (2, lambda a, b: a < b),
+    'pow': (3, pow),
+    'str': (1, str),
+    'parse': (1, None),  # the backend's constructor, applied to a decimal string
+}
+
+# The 32-bit backends only get operands that fit in 32 bits
+MAX_DIGITS = {'str': 9, 'intnum': 9}
+
+
+def _operand(rng, digits, negative):
+    n = rng.randrange(10 ** (digits - 1), 10 ** digits)
+    return -n if negative else n
+
+
+def make_operands(op, digits, signs, seed=0):
+    """The int operands of a case. Shift amounts and exponents are small and non-negative."""
+    rng = Random(f'{op}/{digits}/{signs}/{seed}')
+    operands = [_operand(rng, digits, sign == '-') for sign in signs]
+    if op in ('<<', '>>'):
+        operands[1] = rng.randrange(32)
+    elif op == 'pow':
+        operands[1] = rng.randrange(100, 1000)
+    return operands
+
+
+def _convert(backend, operands, op):
+    number = BACKENDS[backend]
+    if op == 'parse':
+        return [str(operands[0])]
+    if number is int:
+        return operands
+    return [number(str(n)) for n in operands]
+
+
+def ops_per_second(fn, args, min_time, repeat):
+    """The best of repeat runs, each making as many calls as take at least min_time seconds."""
+    number, best = calibrate(fn, args, min_time=min_time)
+    for _ in range(repeat - 1):
+        best = min(best, time_calls(fn, args, number=number))
+    return number / best
+
+
+def retained_blocks_per_op(fn, args, number=100):
+    """The memory blocks still allocated after each call, keeping the results alive."""
+    results = [None] * number
+    gc.collect()
+    before = sys.getallocatedblocks()
+    for i in range(number):
+        results[i] = fn(*args)
+    after = sys.getallocatedblocks()
+    return (after - before) / number
+
+
+def sign_patterns(op):
+    """The signs of the operands of each case. Shift amounts and exponents are never negative."""
+    if op in ('<<', '>>'):
+        return ['++', '-+']
+    if op == 'pow':
+        return [base + '+' + mod for base, mod in product('+-', repeat=2)]
+    return [''.join(signs) for signs in product('+-', repeat=OPERATORS[op][0])]
+
+
+def run_case(backend, op, digits, signs, min_time=0.05, repeat=3):
+    fn = OPERATORS[op][1]
+    if op == 'parse':
+        fn = BACKENDS[backend]
+    args = _convert(backend, make_operands(op, digits, signs), op)
+    return {
+        'backend': backend,
+        'op': op,
+        'digits': digits,
+        'signs': signs,
+        'ops_per_sec': ops_per_second(fn, args, min_time, repeat),
+        'retained_blocks_per_op': retained_blocks_per_op(fn, args),
+        'peak_bytes': peak_bytes(fn, args),
+    }
+
+
+def run_suite(backends=tuple(BACKENDS), ops=tuple(OPERATORS), sizes=(1, 5, 9, 100, 1000),
+              min_time=0.05, repeat=3, report=print):
+    results = []
+    for backend in backends:
+        for op in ops:
+            for digits in sizes:
+                if digits > MAX_DIGITS.get(backend, digits):
+                    continue
+                for signs in sign_patterns(op):
+                    result = run_case(backend, op, digits, signs, min_time, repeat)
+                    results.append(result)
+                    if report:
+                        report(format_result(result))
+    return results
+
+
+def format_result(result):
+    return (f"{result['backend']:>7} {result['op']:>6} {result['digits']:>5} digits {result['signs']:>3}: "
+            f"{result['ops_per_sec']:14,.0f} ops/s {result['retained_blocks_per_op']:7.1f} retained blocks/op "
+            f"{result['peak_bytes']:9,d} peak bytes")
+
+
+def _key(result):
+    return result['backend'], result['op'], result['digits'], result['signs']
+
+
+def compare(results, baseline, tolerance=0.1):
+    """
+    Pair each result with the baseline result of the same case. Returns a list of
+    (result, speedup, regressed) where speedup is the ratio of ops/sec to the baseline's.
+    """
+    previous = {_key(r): r for r in baseline}
+    comparisons = []
+    for result in results:
+        old = previous.get(_key(result))
+        if old:
+            speedup = result['ops_per_sec'] / old['ops_per_sec']
+            comparisons.append((result, speedup, speedup < 1 - tolerance))
+    return comparisons
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the StrNum backends against int.')
+    parser.add_argument('--backends', nargs='+', choices=list(BACKENDS), default=list(BACKENDS))
+    parser.add_argument('--ops', nargs='+', choices=list(OPERATORS), default=list(OPERATORS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1, 5, 9, 100, 1000],
+                        help='operand sizes in decimal digits')
+    parser.add_argument('--min-time', type=float, default=0.05, help='seconds per timing run')
+    parser.add_argument('--repeat', type=int, default=3, help='timing runs per case; the best is kept')
+    parser.add_argument('--output', help='save the results to this JSON file')
+    parser.add_argument('--compare', help='compare with the results in this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='slowdown relative to the compared results that counts as a regression')
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.backends, args.ops, args.sizes, args.min_time, args.repeat)
+    if args.output:
+        with open(args.output, mode='w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = 0
+        print('\nCompared with', args.compare)
+        for result, speedup, regressed in compare(results, baseline, args.tolerance):
+            regressions += regressed
+            print(f"{format_result(result)} {speedup:6.2f}x{'  REGRESSION' if regressed else ''}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
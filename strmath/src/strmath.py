@@ -1,4 +1,5 @@
-from collections import deque
+import re
+from functools import lru_cache
 
 
 class StrNum(object):
@@ -23,6 +24,18 @@ class StrNum(object):
 
     binary_to_digit = {b: d for d, b in digit_to_binary.items()}
 
+    __slots__ = ('_value',)
+
+    def __new__(cls, s, binary=False):
+        # StrNum(...) builds a number of the selected backend (see set_backend)
+        if cls is StrNum:
+            cls = _BACKENDS[_backend]
+        return object.__new__(cls)
+
+    def __reduce__(self):
+        # Rebuilt from its bits, as an instance of the same backend, whatever the selected one
+        return _rebuild, (type(self), self._value)
+
     def __init__(self, s, binary=False):
         # should have validated s, but trusting the client instead
         if binary:
@@ -30,15 +43,14 @@ class StrNum(object):
         elif s in StrNum.digit_to_binary:
             self._value = StrNum.digit_to_binary[s]
         else:
-            n = zero
-            sgn = one
+            negative, digits = False, []
             for d in s:
                 if d == '-':
-                    sgn = -sgn
+                    negative = not negative
                 else:
-                    n *= ten
-                    n += StrNum(d)
-            self._value = (sgn * n)._value
+                    digits.append(d)
+            n = _parse_digits(digits)
+            self._value = (-n if negative else n)._value
 
     def __add__(self, other):
 
@@ -54,36 +66,55 @@ class StrNum(object):
                 else:
                     yield '1' if carry == '0' else '0'
 
-        return StrNum(''.join(sum_bits()), binary=True)
+        return _from_bits(''.join(sum_bits()))
 
     def __lshift__(self, other):
-        b = one
-        bits = deque(self._value)
-        while b <= other:
-            bits.appendleft('0')
-            bits.pop()
-            b = b + one
-        return StrNum(''.join(bits), binary=True)
+        shift = _SHIFTS.get(other._value)
+        if shift is None:  # other < 0 or other > 32
+            return self if other.__is_negative() else zero
+        zeros, _, head, _ = shift
+        return _from_bits(zeros + self._value[head])
 
     def __rshift__(self, other):
-        b = one
-        bits = deque(self._value)
-        sign_bit = '1' if self.__is_negative() else '0'
-        while b <= other:
-            bits.append(sign_bit)
-            bits.popleft()
-            b += one
-        return StrNum(''.join(bits), binary=True)
+        shift = _SHIFTS.get(other._value)
+        if shift is None:  # other < 0 or other > 32
+            if other.__is_negative():
+                return self
+            return -one if self.__is_negative() else zero
+        zeros, ones, _, tail = shift
+        return _from_bits(self._value[tail] + (ones if self.__is_negative() else zeros))
 
     def __neg__(self):
-        one_complement = ''.join('1' if c == '0' else '0' for c in self._value)
-        return StrNum(one_complement, binary=True) + one
+        return ~self + one
+
+    def __invert__(self):
+        return _from_bits(self._value.translate(_FLIP))
+
+    def __and__(self, other):
+        return _from_bits(''.join('1' if b == c == '1' else '0' for b, c in zip(self._value, other._value)))
+
+    def __or__(self, other):
+        return _from_bits(''.join('0' if b == c == '0' else '1' for b, c in zip(self._value, other._value)))
+
+    def __xor__(self, other):
+        return _from_bits(''.join('0' if b == c else '1' for b, c in zip(self._value, other._value)))
+
+    def bit_length(self):
+        """The number of bits needed to represent abs(self), like int.bit_length."""
+        # The bits of -self read as an unsigned number are those of abs(self), even for -2**31
+        bits = (-self if self.__is_negative() else self)._value.rstrip('0')
+        return _COUNTS[bits.replace('0', '1')]
+
+    def bit_count(self):
+        """The number of ones in the binary representation of abs(self) (popcount), like int.bit_count."""
+        bits = (-self if self.__is_negative() else self)._value
+        return _COUNTS[bits.replace('0', '')]
 
     def __sub__(self, other):
         return self + -other
 
     def __is_negative(self):
-        return ('1', '1') in zip(self._value, '00000000000000000000000000000001')
+        return self._value.endswith('1')
 
     def __abs__(self):
         return -self if self.__is_negative() else self
@@ -95,30 +126,50 @@ class StrNum(object):
         return self._value != other._value
 
     def __gt__(self, other):
-        return (other - self).__is_negative()
+        return other < self
 
     def __ge__(self, other):
-        return self == other or self > other
+        return not self < other
 
     def __lt__(self, other):
-        return (self - other).__is_negative()
+        a, b = self._value, other._value
+        if len(a) != len(b):  # other is a wider BigNum
+            return _int_of(self) < _int_of(other)
+        if a.endswith('1') != b.endswith('1'):
+            return a.endswith('1')
+        # Numbers of equal sign compare like their bits, read from the most significant end
+        return a[::-1] < b[::-1]
 
     def __le__(self, other):
-        return self == other or self < other
+        return not other < self
 
     def __mul__(self, other, mod=None):
-        if self.__is_negative():
-            return -(-self).__mul__(other, -mod if mod else None)
+        if mod is not None:
+            return self.__mul_mod(other, mod)
+        # Shift-and-add wraps like two's complement, so negating first only saves additions,
+        # and is skipped for -2**31, which is its own negation
+        if self.__is_negative() and (m := -self) != self:
+            return -m.__mul__(other)
         result = zero
-        if mod: other %= mod
         for b in reversed(self._value):
             result <<= one
             if b == '1':
                 result += other
-            while mod and (result <= mod < zero or zero < mod <= result):
-                result -= mod
         return result
 
+    def __mul_mod(self, other, mod):
+        # self * other % mod, keeping every intermediate result in [0, n), where n = |mod|.
+        # Doubling or adding is replaced by a subtraction whenever the sum would reach n,
+        # so nothing overflows, whatever the size of the modulus.
+        n = abs(mod)
+        a, b = self % n, other % n
+        result = zero
+        for bit in reversed(a._value):
+            result = result - (n - result) if result >= n - result else result << one
+            if bit == '1':
+                result = result - (n - b) if result >= n - b else result + b
+        return result + mod if mod < zero and result != zero else result
+
     def __divmod__(self, other):
         if self.__is_negative() and other.__is_negative():
             q, r = (-self).__divmod__(-other)
@@ -143,8 +194,9 @@ class StrNum(object):
                 q, r = q << one, r << one
                 if b == '1':
                     r += one
-                if r >= other:
-                    r -= other
+                t = r - other  # r itself may have overflowed
+                if not t.__is_negative():
+                    r = t
                     q += one
             return q, r
 
@@ -157,31 +209,545 @@ class StrNum(object):
         return r
 
     def __pow__(self, n, mod=None):
-        base = self % mod if mod else self
+        if mod is not None:
+            return mod_context(_from_bits(mod._value)).pow(self, n)
         p = one
         for b in reversed(n._value):
-            p = p.__mul__(p, mod)
+            p = p * p
             if b == '1':
-                p = p.__mul__(base, mod)
+                p = p * self
         return p
 
     def __repr__(self):
         return f"StrNum('{self}')"
 
     def __str__(self):
-        if self == zero: return '0'
-        if self < zero: return '-' + str(-self)
-        result = ""
-        s = self
-        while s > zero:
-            s, r = s.__divmod__(ten)
-            result = StrNum.binary_to_digit[r._value] + result
-        return result
+        # Works on -abs(self), which, unlike abs(self), cannot overflow
+        m = self if self.__is_negative() else -self
+        digits = []
+        for multiples in reversed(_DECIMAL_TABLE):
+            d = '0'
+            for c in '123456789':
+                t = m + multiples['1']
+                if not t.__is_negative() and t != zero:
+                    break
+                m, d = t, c
+            digits.append(d)
+        result = ''.join(digits).lstrip('0') or '0'
+        return '-' + result if self.__is_negative() else result
 
     def __hash__(self):
         return hash(self._value)
 
 
+def _parse_digits(digits):
+    # Adds up d * 10 ** i from the decimal table, falling back on Horner's rule
+    # when there are more digits than fit in 32 bits
+    n = zero
+    table = iter(_DECIMAL_TABLE)
+    for d in reversed(digits):
+        multiples = next(table, None)
+        if multiples is None or d not in multiples:
+            break
+        if d != '0':
+            n += multiples[d]
+    else:
+        return n
+    n = zero
+    for d in digits:
+        n *= ten
+        n += _from_bits(StrNum.digit_to_binary[d])
+    return n
+
+
+def _decimal_table():
+    # For each power of ten p that fits in 32 bits, the multiples d * p that fit, keyed by d
+    table = []
+    p = one
+    while True:
+        multiples, m = {'0': zero, '1': p}, p
+        table.append(multiples)
+        for d in '23456789':
+            m += p
+            if m < zero:
+                return table
+            multiples[d] = m
+        p = m + p
+
+
+# Shared instances of small numbers, filled in once the constants are defined
+_INTERNED = {}
+_INTERNED_RANGE = range(-128, 1024)
+
+
+def _from_bits(bits):
+    # Wraps a little-endian bit string without going through the backend switch
+    num = _INTERNED.get(bits)
+    if num is None:
+        num = object.__new__(StrNum)
+        num._value = bits
+    return num
+
+
+def _rebuild(cls, bits):
+    # Unpickles a number of the given backend
+    if cls is StrNum:
+        return _from_bits(bits)
+    num = object.__new__(cls)
+    num.__init__(bits, binary=True)
+    return num
+
+
+_WIDTH = 32
+_SIGN = 1 << _WIDTH - 1
+_MASK = (1 << _WIDTH) - 1
+_FLIP = str.maketrans('01', '10')
+
+
+def _shift_table():
+    # For each shift amount k from 0 to 32, keyed by the bits of StrNum(k): the padding
+    # and the slices of a 32-bit string that shift it by k in one go
+    table, k = {}, zero
+    for i in range(_WIDTH + 1):
+        table[k._value] = ('0' * i, '1' * i, slice(_WIDTH - i), slice(i, None))
+        k += one
+    return table
+
+
+def _count_table():
+    # StrNum(k) keyed by a string of k ones, for k from 0 to 32
+    table, k = {}, zero
+    for i in range(_WIDTH + 1):
+        table['1' * i] = k
+        k += one
+    return table
+
+
+def _int_of(num):
+    # The signed value of a number of either backend
+    try:
+        return num._n
+    except AttributeError:
+        n = int(num._value[::-1], 2)
+        return n - ((n & _SIGN) << 1)
+
+
+class IntNum(StrNum):
+    """
+    A StrNum that keeps its value in a single int, wrapped to a signed 32-bit word.
+
+    It supports the same operators as StrNum and gives the same results, only without
+    the string manipulations. Select it with set_backend('int') or instantiate it directly.
+    """
+
+    __slots__ = ('_n',)
+    _interned = {}
+
+    def __init__(self, s, binary=False):
+        if binary:
+            n = int(s[::-1], 2)
+        else:
+            digits = s.replace('-', '')
+            n = int(digits) if digits else 0
+            if (len(s) - len(digits)) & 1:
+                n = -n
+        self._n = ((n + _SIGN) & _MASK) - _SIGN
+
+    def _make(self, n):
+        n = ((n + _SIGN) & _MASK) - _SIGN
+        num = self._interned.get(n)
+        if num is None:
+            num = object.__new__(self.__class__)
+            num._n = n
+        return num
+
+    @property
+    def _value(self):
+        return format(self._n & _MASK, '032b')[::-1]
+
+    def _StrNum__is_negative(self):
+        return self._n < 0
+
+    def __add__(self, other):
+        return self._make(self._n + _int_of(other))
+
+    def __sub__(self, other):
+        return self._make(self._n - _int_of(other))
+
+    def __neg__(self):
+        return self._make(-self._n)
+
+    def __abs__(self):
+        return self._make(abs(self._n))
+
+    def __invert__(self):
+        return self._make(~self._n)
+
+    def __and__(self, other):
+        return self._make(self._n & _int_of(other))
+
+    def __or__(self, other):
+        return self._make(self._n | _int_of(other))
+
+    def __xor__(self, other):
+        return self._make(self._n ^ _int_of(other))
+
+    def bit_length(self):
+        return self._make(self._n.bit_length())
+
+    def bit_count(self):
+        return self._make(self._n.bit_count())
+
+    def __lshift__(self, other):
+        k = _int_of(other)
+        if k <= 0:
+            return self
+        return self._make(self._n << k if k < _WIDTH else 0)
+
+    def __rshift__(self, other):
+        k = _int_of(other)
+        if k <= 0:
+            return self
+        return self._make(self._n >> k)
+
+    def __eq__(self, other):
+        return self._n == _int_of(other)
+
+    def __ne__(self, other):
+        return self._n != _int_of(other)
+
+    def __gt__(self, other):
+        return self._n > _int_of(other)
+
+    def __ge__(self, other):
+        return self._n >= _int_of(other)
+
+    def __lt__(self, other):
+        return self._n < _int_of(other)
+
+    def __le__(self, other):
+        return self._n <= _int_of(other)
+
+    def __mul__(self, other, mod=None):
+        if mod is None:
+            return self._make(self._n * _int_of(other))
+        return self._make(self._n * _int_of(other) % _int_of(mod))
+
+    def __divmod__(self, other):
+        q, r = divmod(self._n, _int_of(other))
+        return self._make(q), self._make(r)
+
+    def __floordiv__(self, other):
+        return self._make(self._n // _int_of(other))
+
+    def __mod__(self, other):
+        return self._make(self._n % _int_of(other))
+
+    def __pow__(self, n, mod=None):
+        # Like StrNum, the exponent's bits are read as an unsigned word
+        e = _int_of(n) & _MASK
+        if e == 0 and mod is None:
+            return self._make(1)
+        return self._make(pow(self._n, e, _MASK + 1 if mod is None else _int_of(mod)))
+
+    def __str__(self):
+        return str(self._n)
+
+    def __hash__(self):
+        return hash(self._value)
+
+
+# Python refuses to convert ints with more digits than this to or from decimal strings
+_DIGITS_PER_CHUNK = 4000
+_NEWTON_CUTOFF = 1 << 15  # bits of precision below which plain division is used
+_NEWTON_THRESHOLD = 1 << 17  # operand size (bits) from which Newton division pays off
+
+
+@lru_cache(maxsize=None)
+def _pow10(k):
+    return 10 ** k
+
+
+def _parse_decimal(digits):
+    # Divide and conquer: the split points are chunk sizes times powers of two,
+    # so only a few powers of ten are ever computed
+    if len(digits) <= _DIGITS_PER_CHUNK:
+        return int(digits)
+    k = _DIGITS_PER_CHUNK
+    while 2 * k < len(digits):
+        k *= 2
+    return _parse_decimal(digits[:-k]) * _pow10(k) + _parse_decimal(digits[-k:])
+
+
+def _format_decimal(n, width=0):
+    if n < 0:
+        return '-' + _format_decimal(-n)
+    if n < _pow10(_DIGITS_PER_CHUNK):
+        return str(n).zfill(width)
+    k = _DIGITS_PER_CHUNK
+    while _pow10(2 * k) <= n:
+        k *= 2
+    q, r = _divmod(n, _pow10(k))
+    return _format_decimal(q, width - k) + _format_decimal(r, k)
+
+
+def _reciprocal(d, p):
+    """
+    Approximate 2 ** (d.bit_length() + p) // d, within a few units, by Newton's iteration.
+    Each step doubles the precision, so this costs a few multiplications of p-bit numbers.
+    """
+    m = d.bit_length()
+    if m > p + 32:  # only the leading bits of d matter
+        return _reciprocal(d >> m - p - 32, p)
+    if p <= _NEWTON_CUTOFF:
+        return (1 << m + p) // d
+    h = (p >> 1) + 16
+    x = _reciprocal(d, h) << p - h
+    return x + (x * ((1 << m + p) - d * x) >> m + p)
+
+
+def _divmod_newton(a, b):
+    """divmod(a, b) for a >= 0 and b > 0, multiplying by the reciprocal of b."""
+    m = b.bit_length()
+    p = a.bit_length() - m + 1
+    if p <= 0:
+        return 0, a
+    q = a * _reciprocal(b, p) >> m + p
+    dq, r = divmod(a - q * b, b)  # corrects the last few units of q
+    return q + dq, r
+
+
+def _divmod(a, b):
+    if b.bit_length() < _NEWTON_THRESHOLD or a.bit_length() - b.bit_length() < _NEWTON_THRESHOLD:
+        return divmod(a, b)
+    if b < 0:
+        q, r = _divmod(-a, -b)
+        return q, -r
+    if a < 0:
+        q, r = _divmod_newton(-a, b)
+        return (-q, 0) if r == 0 else (-q - 1, b - r)
+    return _divmod_newton(a, b)
+
+
+class BigNum(IntNum):
+    """
+    A StrNum of variable width: the number grows as needed and never overflows.
+
+    Multiplication is done by Python's int, which switches to Karatsuba multiplication
+    for large operands. Division of large operands multiplies by a Newton reciprocal.
+    Decimal strings of any length may be converted to and from BigNum.
+    """
+
+    __slots__ = ()
+    _interned = {}
+
+    def __init__(self, s, binary=False):
+        if binary:
+            n = int(s[::-1], 2)
+            self._n = n - (1 << len(s)) if s.endswith('1') else n
+        else:
+            digits = s.replace('-', '')
+            n = _parse_decimal(digits) if digits else 0
+            self._n = -n if (len(s) - len(digits)) & 1 else n
+
+    def _make(self, n):
+        num = self._interned.get(n)
+        if num is None:
+            num = object.__new__(self.__class__)
+            num._n = n
+        return num
+
+    @property
+    def _value(self):
+        width = max(_WIDTH, self._n.bit_length() + 1)
+        return format(self._n & (1 << width) - 1, f'0{width}b')[::-1]
+
+    def __lshift__(self, other):
+        k = _int_of(other)
+        return self._make(self._n << k) if k > 0 else self
+
+    def __divmod__(self, other):
+        q, r = _divmod(self._n, _int_of(other))
+        return self._make(q), self._make(r)
+
+    def __floordiv__(self, other):
+        return self._make(_divmod(self._n, _int_of(other))[0])
+
+    def __mod__(self, other):
+        return self._make(_divmod(self._n, _int_of(other))[1])
+
+    def __pow__(self, n, mod=None):
+        e = _int_of(n)
+        if mod is None:
+            if e < 0:
+                raise ValueError('BigNum cannot be raised to a negative power without a modulus')
+            return self._make(self._n ** e)
+        return self._make(pow(self._n, e, _int_of(mod)))
+
+    def __str__(self):
+        return _format_decimal(self._n)
+
+    def __hash__(self):
+        # Agrees with the 32-bit backends on the values they can represent
+        return hash(self._value) if -_SIGN <= self._n < _SIGN else hash(self._n)
+
+
+def _intern_small_numbers():
+    for n in _INTERNED_RANGE:
+        bits = format(n & _MASK, '032b')[::-1]
+        _INTERNED.setdefault(bits, _from_bits(bits))
+        for cls in (IntNum, BigNum):
+            num = object.__new__(cls)
+            num._n = n
+            cls._interned[n] = num
+
+
+def parse_many(strings):
+    """Convert decimal strings to numbers of the selected backend. Repeated strings are converted only once."""
+    cls = _BACKENDS[_backend]
+    converted = {}
+    result = []
+    for s in strings:
+        n = converted.get(s)
+        if n is None:
+            n = converted[s] = cls(s)
+        result.append(n)
+    return result
+
+
+def format_many(nums):
+    """Convert numbers to decimal strings. Repeated numbers are converted only once."""
+    converted = {}
+    result = []
+    for n in nums:
+        s = converted.get(n)
+        if s is None:
+            s = converted[n] = str(n)
+        result.append(s)
+    return result
+
+
+_BACKENDS = {'str': StrNum, 'int': IntNum, 'big': BigNum}
+_backend = 'str'
+
+
+def set_backend(name):
+    """
+    Select the backend that StrNum(...) instantiates: 'str' for the string
+    representation, 'int' for IntNum, or 'big' for BigNum. Returns the name of the previous backend.
+    """
+    global _backend
+    if name not in _BACKENDS:
+        raise ValueError(f'Unknown backend {name!r}, expected one of {sorted(_BACKENDS)}')
+    previous, _backend = _backend, name
+    return previous
+
+
 zero = StrNum('0')
 one  = StrNum('1')
 ten  = StrNum('01010000000000000000000000000000', binary=True)
+_DECIMAL_TABLE = _decimal_table()
+_INTERNED.update((n._value, n) for n in (zero, one, ten))
+_intern_small_numbers()
+_SHIFTS = _shift_table()
+_COUNTS = _count_table()
+
+
+class ModContext(object):
+    """
+    Modular arithmetic modulo a fixed StrNum, for repeated multiplications and powers.
+
+    Odd moduli below 2 ** 30 are handled with Montgomery multiplication. In binary, a
+    Montgomery step only adds, tests the lowest bit, and drops it, so it never compares or
+    subtracts as the ordinary modular multiplication does. Other moduli fall back on that
+    ordinary multiplication. Results follow the sign of the modulus, like Python's % and pow.
+    """
+
+    # Odd exponent windows of up to 4 bits, most significant bit first
+    windows = ('1', '11', '101', '111', '1001', '1011', '1101', '1111')
+    window_pattern = re.compile('1[01]{0,2}1|1|0')
+
+    def __init__(self, mod):
+        self.mod = mod
+        self.n = abs(mod)
+        # n is odd and the two most significant bits are 0
+        self.montgomery = self.n._value.startswith('1') and self.n._value.endswith('00')
+        if self.montgomery:
+            # With R = 2 ** 32, a number a is represented by a * R % n
+            r2 = one
+            for _ in range(64):
+                r2 <<= one
+                if r2 >= self.n:
+                    r2 -= self.n
+            self.r2 = r2
+            self.one = self._mont_mul(one, r2)
+        else:
+            self.one = one
+
+    def _mont_mul(self, a, b):
+        # a * b / R % n, provided that b < n
+        n = self.n
+        u = zero
+        for bit in a._value:
+            if bit == '1':
+                u += b
+            if u._value.startswith('1'):
+                u += n
+            u = _from_bits(u._value[1:] + '0')
+        return u - n if u >= n else u
+
+    def _to_domain(self, a):
+        if not self.montgomery:
+            return a % self.n
+        if a < zero:
+            x = self._mont_mul(-a, self.r2)
+            return self.n - x if x != zero else x
+        return self._mont_mul(a, self.r2)
+
+    def _from_domain(self, a):
+        a = self._mont_mul(a, one) if self.montgomery else a
+        return a + self.mod if self.mod < zero and a != zero else a
+
+    def _mul(self, a, b):
+        return self._mont_mul(a, b) if self.montgomery else a.__mul__(b, self.n)
+
+    def mul(self, a, b):
+        """Return a * b % mod."""
+        return self._from_domain(self._mul(self._to_domain(a), self._to_domain(b)))
+
+    def pow(self, base, e):
+        """Return pow(base, e, mod), reading the bits of e as an unsigned number like StrNum does."""
+        bits = e._value[::-1].lstrip('0')
+        if not bits:
+            return one % self.mod
+        x = self._to_domain(base)
+        x2 = self._mul(x, x)
+        table = {}
+        for w in self.windows:
+            table[w] = x
+            x = self._mul(x, x2)
+        p = self.one
+        for w in self.window_pattern.findall(bits):
+            for _ in w:
+                p = self._mul(p, p)
+            if w != '0':
+                p = self._mul(p, table[w])
+        return self._from_domain(p)
+
+    def inverse(self, a):
+        """Return the x for which a * x % mod == 1 % mod, using the extended Euclidean algorithm."""
+        r0, r1 = self.n, a % self.n
+        x0, x1 = zero, one
+        while r1 != zero:
+            q, r = divmod(r0, r1)
+            r0, r1 = r1, r
+            x0, x1 = x1, x0 - q * x1
+        if r0 != one:
+            raise ValueError('base is not invertible for the given modulus')
+        return x0 % self.mod
+
+
+@lru_cache(maxsize=64)
+def mod_context(mod):
+    """Return the ModContext for mod, reusing the one built by a previous call."""
+    return ModContext(mod)
@@ -0,0 +1,114 @@
+import numpy as np
+
+from strmath.src.strmath import StrNum, _int_of, _SIGN, _MASK, _WIDTH
+
+
+def _wrap(n):
+    return ((n + _SIGN) & _MASK) - _SIGN
+
+
+class StrNumArray(object):
+    """
+    A batch of 32-bit StrNums stored in a NumPy int32 array.
+
+    Operations are element-wise and follow the same rules as StrNum: results wrap around
+    in two's complement, division and modulo round towards minus infinity, and shift
+    amounts below 0 leave a number unchanged. The other operand may be a StrNumArray of
+    the same length or a single StrNum. Comparisons return NumPy arrays of booleans.
+    """
+
+    def __init__(self, data):
+        self.data = np.asarray(data, dtype=np.int32)
+
+    @classmethod
+    def from_strnums(cls, nums):
+        return cls(np.fromiter((_wrap(_int_of(n)) for n in nums), dtype=np.int32))
+
+    def to_strnums(self):
+        """Convert to a list of numbers of the selected StrNum backend."""
+        return [StrNum(format(n & _MASK, '032b')[::-1], binary=True) for n in self.data.tolist()]
+
+    @staticmethod
+    def _operand(other):
+        if isinstance(other, StrNumArray):
+            return other.data
+        return np.int32(_wrap(_int_of(other)))
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return StrNumArray(self.data[item])
+        return StrNumArray([self.data[item]]).to_strnums()[0]
+
+    def __iter__(self):
+        return iter(self.to_strnums())
+
+    def __add__(self, other):
+        return StrNumArray(self.data + self._operand(other))
+
+    def __sub__(self, other):
+        return StrNumArray(self.data - self._operand(other))
+
+    def __neg__(self):
+        return StrNumArray(-self.data)
+
+    def __mul__(self, other):
+        return StrNumArray(self.data.astype(np.int64) * self._operand(other))
+
+    def __divmod__(self, other):
+        divisor = self._operand(other)
+        if np.any(divisor == 0):
+            raise ZeroDivisionError('StrNumArray division by zero')
+        # int64 keeps -2 ** 31 // -1 from overflowing before it wraps
+        q, r = np.divmod(self.data.astype(np.int64), divisor)
+        return StrNumArray(q.astype(np.int32)), StrNumArray(r)
+
+    def __floordiv__(self, other):
+        q, _ = self.__divmod__(other)
+        return q
+
+    def __mod__(self, other):
+        _, r = self.__divmod__(other)
+        return r
+
+    def __lshift__(self, other):
+        k = np.clip(self._operand(other), 0, _WIDTH)
+        return StrNumArray((self.data.astype(np.int64) << k).astype(np.int32))
+
+    def __rshift__(self, other):
+        return StrNumArray(self.data >> np.clip(self._operand(other), 0, _WIDTH - 1))
+
+    def __and__(self, other):
+        return StrNumArray(self.data & self._operand(other))
+
+    def __or__(self, other):
+        return StrNumArray(self.data | self._operand(other))
+
+    def __xor__(self, other):
+        return StrNumArray(self.data ^ self._operand(other))
+
+    def __invert__(self):
+        return StrNumArray(~self.data)
+
+    def __eq__(self, other):
+        return self.data == self._operand(other)
+
+    def __ne__(self, other):
+        return self.data != self._operand(other)
+
+    def __gt__(self, other):
+        return self.data > self._operand(other)
+
+    def __ge__(self, other):
+        return self.data >= self._operand(other)
+
+    def __lt__(self, other):
+        return self.data < self._operand(other)
+
+    def __le__(self, other):
+        return self.data <= self._operand(other)
+
+    def __repr__(self):
+        return f"StrNumArray({[str(n) for n in self.data.tolist()]})"
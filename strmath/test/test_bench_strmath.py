@@ -0,0 +1,24 @@
+from unittest import TestCase
+
+from strmath.src.bench_strmath import run_suite, compare, make_operands, sign_patterns
+
+
+class TestBenchStrmath(TestCase):
+    def test_operands(self):
+        self.assertEqual(make_operands('+', 5, '+-'), make_operands('+', 5, '+-'))
+        a, b = make_operands('+', 5, '+-')
+        self.assertTrue(10 ** 4 <= a < 10 ** 5 and -10 ** 5 < b <= -10 ** 4)
+        self.assertTrue(0 <= make_operands('<<', 5, '-+')[1] < 32)
+        self.assertEqual(['++', '-+'], sign_patterns('>>'))
+        self.assertEqual(4, len(sign_patterns('pow')))
+
+    def test_suite(self):
+        results = run_suite(['int', 'str', 'bignum'], ['*', 'str'], [5, 100], min_time=0.001, repeat=1,
+                            report=None)
+        # Each size has 4 sign patterns for '*' and 2 for 'str', and str only gets the 5-digit size
+        self.assertEqual(12 + 6 + 12, len(results))
+        for result in results:
+            self.assertGreater(result['ops_per_sec'], 0)
+        slower = [dict(r, ops_per_sec=r['ops_per_sec'] * 2) for r in results]
+        self.assertTrue(all(regressed for _, _, regressed in compare(results, slower)))
+        self.assertFalse(any(regressed for _, _, regressed in compare(results, results)))
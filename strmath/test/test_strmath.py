@@ -1,8 +1,11 @@
+import copy
+import pickle
 from random import randrange
 from unittest import TestCase
 from time import perf_counter as now
 
-from strmath.src.strmath import StrNum
+from strmath.src.strmath import StrNum, IntNum, BigNum, set_backend, parse_many, format_many
+from strmath.src.strmath import _divmod_newton, mod_context
 
 
 class TestStrNum(TestCase):
@@ -115,3 +118,239 @@ class TestStrNum(TestCase):
             expected = str(n)
             actual = str(StrNum(str(n)))
             self.assertEqual(expected, actual)
+
+    def test_shifts(self):
+        for n in (1071, -1071, 2 ** 31 - 1, -2 ** 31):
+            for k in (0, 1, 5, 31):
+                self.assertEqual(StrNum(str((n << k) % 2 ** 32 - (2 ** 32 if (n << k) & 2 ** 31 else 0))),
+                                 StrNum(str(n)) << StrNum(str(k)))
+                self.assertEqual(StrNum(str(n >> k)), StrNum(str(n)) >> StrNum(str(k)))
+            self.assertEqual(StrNum(str(n)), StrNum(str(n)) << StrNum('-3'))
+            self.assertEqual(StrNum('0'), StrNum(str(n)) << StrNum('40'))
+            self.assertEqual(StrNum(str(n >> 40)), StrNum(str(n)) >> StrNum('40'))
+
+    def test_bitwise(self):
+        bound = 2 ** 31
+        for _ in range(10):
+            x, y = randrange(-bound, bound), randrange(-bound, bound)
+            a, b = StrNum(str(x)), StrNum(str(y))
+            self.assertEqual(StrNum(str(x & y)), a & b)
+            self.assertEqual(StrNum(str(x | y)), a | b)
+            self.assertEqual(StrNum(str(x ^ y)), a ^ b)
+            self.assertEqual(StrNum(str(~x)), ~a)
+            self.assertEqual(StrNum(str(x.bit_length())), a.bit_length())
+            self.assertEqual(StrNum(str(x.bit_count())), a.bit_count())
+        self.assertEqual(StrNum('32'), StrNum('-2147483648').bit_length())
+        self.assertEqual(StrNum('0'), StrNum('0').bit_length())
+
+    def test_compare_extremes(self):
+        big, small = StrNum('2147483647'), StrNum('-2147483648')
+        self.assertTrue(small < big)
+        self.assertTrue(big > StrNum('-2'))
+        self.assertTrue(small <= small)
+        self.assertFalse(big < small)
+
+    def test_compact(self):
+        self.assertFalse(hasattr(StrNum('11'), '__dict__'))
+        self.assertFalse(hasattr(IntNum('11'), '__dict__'))
+        self.assertIs(StrNum('6') + StrNum('6'), StrNum('3') * StrNum('4'))
+        self.assertIs(IntNum('6') + IntNum('6'), IntNum('3') * IntNum('4'))
+        self.assertIs(StrNum('1') - StrNum('1'), StrNum('0') * StrNum('5'))
+
+    def test_str_extremes(self):
+        for n in ('0', '-2147483648', '2147483647', '1000000000', '-999999999'):
+            self.assertEqual(n, str(StrNum(n)))
+        self.assertEqual(StrNum('5'), StrNum('--5'))
+
+    def test_init_wraps(self):
+        for n in (2 ** 31, 10 ** 11 + 7, -3 * 10 ** 12):
+            self.assertEqual(str((n + 2 ** 31) % 2 ** 32 - 2 ** 31), str(StrNum(str(n))))
+
+    def test_many(self):
+        strings = [str(randrange(-10 ** 9, 10 ** 9)) for _ in range(20)] * 2
+        nums = parse_many(strings)
+        self.assertEqual([StrNum(s) for s in strings], nums)
+        self.assertEqual(strings, format_many(nums))
+        previous = set_backend('big')
+        try:
+            self.assertEqual([BigNum('12345678901234567890')] * 2, parse_many(['12345678901234567890'] * 2))
+        finally:
+            set_backend(previous)
+
+
+class TestPickle(TestCase):
+    def test_round_trip(self):
+        for cls, values in ((StrNum, ['0', '7', '-123456', '2147483647', '-2147483648']),
+                            (IntNum, ['0', '7', '-123456', '2147483647', '-2147483648']),
+                            (BigNum, ['0', '7', '-123456', '9' * 50, '-' + '9' * 50])):
+            for s in values:
+                num = cls(s)
+                for clone in (pickle.loads(pickle.dumps(num)), copy.copy(num), copy.deepcopy(num)):
+                    self.assertIs(cls, type(clone))
+                    self.assertEqual(s, str(clone))
+
+    def test_backend_is_kept(self):
+        data = pickle.dumps(StrNum('42'))
+        previous = set_backend('big')
+        try:
+            self.assertIs(StrNum, type(pickle.loads(data)))
+        finally:
+            set_backend(previous)
+
+
+class TestModContext(TestCase):
+    def test_mul(self):
+        bound = int(1e9)
+        for mod in (999999937, -999999937, 1000000000, -1024, 2 ** 30 + 1):
+            context = mod_context(StrNum(str(mod)))
+            for _ in range(5):
+                op1 = randrange(-bound, bound + 1)
+                op2 = randrange(-bound, bound + 1)
+                expected = StrNum(str(op1 * op2 % mod))
+                self.assertEqual(expected, context.mul(StrNum(str(op1)), StrNum(str(op2))),
+                                 f"Failed for op1 = {op1}, op2 = {op2}, mod = {mod}")
+
+    def test_pow(self):
+        for mod in (7, -7, 1, 2, 1000, 65537):
+            for base in (-5, 0, 3, 123456):
+                for exp in (0, 1, 2, 31, 1000):
+                    expected = StrNum(str(pow(base, exp, mod)))
+                    actual = mod_context(StrNum(str(mod))).pow(StrNum(str(base)), StrNum(str(exp)))
+                    self.assertEqual(expected, actual, f"Failed for base = {base}, exp = {exp}, mod = {mod}")
+                    actual = pow(StrNum(str(base)), StrNum(str(exp)), StrNum(str(mod)))
+                    self.assertEqual(expected, actual, f"Failed for base = {base}, exp = {exp}, mod = {mod}")
+
+    def test_large_moduli(self):
+        # Moduli of 2 ** 30 and above are not handled by Montgomery multiplication
+        for mod in (2 ** 31 - 1, -(2 ** 31 - 1), 2 ** 30 + 3, 2 ** 31 - 2, 1500000001):
+            context = mod_context(StrNum(str(mod)))
+            for op1, op2 in ((10 ** 9, 10 ** 9), (-(2 ** 31 - 1), 2 ** 31 - 1), (2 ** 31 - 2, 2 ** 31 - 3)):
+                self.assertEqual(StrNum(str(op1 * op2 % mod)), context.mul(StrNum(str(op1)), StrNum(str(op2))),
+                                 f"Failed for op1 = {op1}, op2 = {op2}, mod = {mod}")
+            for base, exp in ((3, 1000), (-5, 2 ** 31 - 1), (2 ** 31 - 2, 12345)):
+                expected = StrNum(str(pow(base, exp, mod)))
+                for cls in (StrNum, IntNum):
+                    self.assertEqual(expected, pow(cls(str(base)), cls(str(exp)), cls(str(mod))),
+                                     f"Failed for {cls.__name__}, base = {base}, exp = {exp}, mod = {mod}")
+
+    def test_inverse(self):
+        for a, mod in ((3, 101), (-3, -101), (77, 1000), (-123457, 1000), (123456, 999999937)):
+            expected = StrNum(str(pow(a, -1, mod)))
+            self.assertEqual(expected, mod_context(StrNum(str(mod))).inverse(StrNum(str(a))))
+        self.assertRaises(ValueError, mod_context(StrNum('1000')).inverse, StrNum('15'))
+
+    def test_context_is_reused(self):
+        self.assertIs(mod_context(StrNum('700')), mod_context(StrNum('700')))
+
+
+class TestIntNum(TestCase):
+    def assertSameAsStrNum(self, op, *operands):
+        expected = op(*(StrNum(str(n)) for n in operands))
+        actual = op(*(IntNum(str(n)) for n in operands))
+        self.assertEqual(str(expected), str(actual), f"Failed for operands = {operands}")
+
+    def test_value(self):
+        self.assertEqual('11010000000000000000000000000000', IntNum('11')._value)
+        self.assertEqual(StrNum('-11')._value, IntNum('-11')._value)
+        self.assertEqual(IntNum('11'), IntNum('11010000000000000000000000000000', binary=True))
+
+    def test_arithmetic(self):
+        bound = int(1e9)
+        for _ in range(10):
+            op1 = randrange(-bound, bound + 1)
+            op2 = randrange(-bound, bound)
+            if op2 == 0: op2 = bound
+            self.assertSameAsStrNum(lambda x, y: x + y, op1, op2)
+            self.assertSameAsStrNum(lambda x, y: x - y, op1, op2)
+            self.assertSameAsStrNum(lambda x, y: x * y, op1, op2)
+            self.assertSameAsStrNum(lambda x, y: x.__mul__(y, y), op1, op2 // 2 or 1)
+            self.assertSameAsStrNum(divmod, op1, op2)
+            self.assertSameAsStrNum(lambda x, y: x < y, op1, op2)
+
+    def test_wrapping(self):
+        self.assertSameAsStrNum(lambda x, y: x + y, 2 ** 31 - 1, 2)
+        self.assertSameAsStrNum(lambda x, y: x * y, 123456789, 987654321)
+        self.assertSameAsStrNum(lambda x, y: x * y, -2 ** 31, 3)
+        self.assertSameAsStrNum(pow, -2, 31)
+        self.assertSameAsStrNum(lambda x: x, 2 ** 32 + 5)
+
+    def test_shifts(self):
+        for n in (1071, -1071):
+            for k in (-1, 0, 3, 30, 32, 40):
+                self.assertSameAsStrNum(lambda x, y: x << y, n, k)
+                self.assertSameAsStrNum(lambda x, y: x >> y, n, k)
+
+    def test_bitwise(self):
+        for n, m in ((1071, -20), (-2 ** 31, 2 ** 31 - 1), (0, -1)):
+            for op in (lambda x, y: x & y, lambda x, y: x | y, lambda x, y: x ^ y,
+                       lambda x, y: ~x, lambda x, y: x.bit_length(), lambda x, y: x.bit_count()):
+                self.assertSameAsStrNum(op, n, m)
+
+    def test_pow(self):
+        bound = int(1e9)
+        for _ in range(5):
+            base = randrange(-bound, bound + 1)
+            exp = randrange(0, 100)
+            mod = randrange(-bound, bound) or bound
+            self.assertSameAsStrNum(pow, base, exp, mod)
+            self.assertSameAsStrNum(pow, base, exp)
+        self.assertSameAsStrNum(pow, 3, -1, 7)
+        for mod in (7, -7, 1, -1):
+            self.assertSameAsStrNum(pow, 3, 0, mod)
+
+    def test_mixed_backends(self):
+        self.assertEqual(IntNum('13') + StrNum('-20'), StrNum('-7'))
+        self.assertEqual(StrNum('13') * IntNum('-20'), IntNum('-260'))
+        self.assertEqual(hash(IntNum('-7')), hash(StrNum('-7')))
+
+    def test_set_backend(self):
+        previous = set_backend('int')
+        try:
+            self.assertIsInstance(StrNum('5'), IntNum)
+            self.assertEqual(StrNum('5') * StrNum('7'), IntNum('35'))
+        finally:
+            set_backend(previous)
+        self.assertNotIsInstance(StrNum('5'), IntNum)
+        self.assertRaises(ValueError, set_backend, 'float')
+
+
+class TestBigNum(TestCase):
+    def test_no_overflow(self):
+        self.assertEqual(str(BigNum('2147483647') + BigNum('1')), '2147483648')
+        self.assertEqual(str(BigNum('-1024') << BigNum('40')), str(-1024 << 40))
+        self.assertEqual(str(BigNum('3') ** BigNum('100')), str(3 ** 100))
+
+    def test_value(self):
+        self.assertEqual(BigNum('-11')._value, StrNum('-11')._value)
+        self.assertEqual(BigNum(BigNum('-12345678901234567890')._value, binary=True),
+                         BigNum('-12345678901234567890'))
+
+    def test_many_digits(self):
+        digits = ''.join(str(randrange(10)) for _ in range(30000)).lstrip('0')
+        n = BigNum('-' + digits)
+        self.assertEqual('-' + digits, str(n))
+        self.assertEqual('-' + digits + '0' * 5000, str(n * BigNum('10') ** BigNum('5000')))
+        self.assertEqual(n, n * BigNum('7') ** BigNum('5000') // BigNum('7') ** BigNum('5000'))
+
+    def test_divmod(self):
+        for bits in (10, 100, 4000):
+            for _ in range(5):
+                dividend = randrange(-2 ** (3 * bits), 2 ** (3 * bits))
+                divisor = randrange(-2 ** bits, 2 ** bits) or 1
+                q, r = divmod(dividend, divisor)
+                actual = divmod(BigNum(str(dividend)), BigNum(str(divisor)))
+                self.assertEqual((BigNum(str(q)), BigNum(str(r))), actual)
+
+    def test_divmod_newton(self):
+        for bits in (100, 50000, 200000):
+            dividend = randrange(2 ** (2 * bits))
+            divisor = randrange(1, 2 ** bits)
+            self.assertEqual(divmod(dividend, divisor), _divmod_newton(dividend, divisor))
+
+    def test_pow_with_mod(self):
+        base, exp, mod = randrange(-10 ** 50, 10 ** 50), randrange(10 ** 20), randrange(1, 10 ** 40)
+        self.assertEqual(BigNum(str(pow(base, exp, mod))),
+                         pow(BigNum(str(base)), BigNum(str(exp)), BigNum(str(mod))))
+        self.assertEqual(BigNum(str(pow(3, -1, 7))), pow(BigNum('3'), BigNum('-1'), BigNum('7')))
+        for mod in (7, -7, 1, -1):
+            self.assertEqual(BigNum(str(pow(3, 0, mod))), pow(BigNum('3'), BigNum('0'), BigNum(str(mod))))
@@ -0,0 +1,48 @@
+from random import randrange
+from unittest import TestCase
+
+import numpy as np
+
+from strmath.src.strmath import StrNum, IntNum
+from strmath.src.strnumarray import StrNumArray
+
+
+class TestStrNumArray(TestCase):
+    def setUp(self):
+        bound = 2 ** 31
+        self.xs = [IntNum(str(randrange(-bound, bound))) for _ in range(50)] + [IntNum('-2147483648')]
+        self.ys = [IntNum(str(randrange(-bound, bound) or 1)) for _ in range(50)] + [IntNum('-1')]
+        self.a = StrNumArray.from_strnums(self.xs)
+        self.b = StrNumArray.from_strnums(self.ys)
+
+    def assertElementwise(self, op):
+        expected = [op(x, y) for x, y in zip(self.xs, self.ys)]
+        self.assertEqual(expected, op(self.a, self.b).to_strnums())
+
+    def test_conversion(self):
+        self.assertEqual(self.xs, self.a.to_strnums())
+        self.assertEqual([StrNum('-7'), StrNum('11')], StrNumArray([-7, 11]).to_strnums())
+        self.assertEqual(StrNum('11'), StrNumArray([-7, 11])[-1])
+
+    def test_arithmetic(self):
+        self.assertElementwise(lambda x, y: x + y)
+        self.assertElementwise(lambda x, y: x - y)
+        self.assertElementwise(lambda x, y: x * y)
+        self.assertElementwise(lambda x, y: x // y)
+        self.assertElementwise(lambda x, y: x % y)
+        self.assertElementwise(lambda x, y: -x)
+        self.assertElementwise(lambda x, y: x ^ ~y)
+
+    def test_shifts(self):
+        amounts = [IntNum(str(k)) for k in (-1, 0, 1, 17, 31, 32, 40)]
+        for k in amounts:
+            self.assertEqual([x << k for x in self.xs], (self.a << k).to_strnums())
+            self.assertEqual([x >> k for x in self.xs], (self.a >> k).to_strnums())
+
+    def test_compare(self):
+        self.assertEqual([x < y for x, y in zip(self.xs, self.ys)], list(self.a < self.b))
+        self.assertTrue(np.all(self.a == self.a))
+        self.assertEqual([x >= StrNum('0') for x in self.xs], list(self.a >= StrNum('0')))
+
+    def test_division_by_zero(self):
+        self.assertRaises(ZeroDivisionError, divmod, self.a, StrNum('0'))
@@ -0,0 +1,38 @@
+"""Timing and memory helpers shared by the benchmarks of the notebooks."""
+import tracemalloc
+from time import perf_counter
+
+
+def time_calls(fn, args=(), kwargs=None, number=1):
+    """The seconds taken by number calls to fn."""
+    kwargs = kwargs or {}
+    start = perf_counter()
+    for _ in range(number):
+        fn(*args, **kwargs)
+    return perf_counter() - start
+
+
+def calibrate(fn, args=(), kwargs=None, min_time=0.05):
+    """
+    The number of calls to fn that take at least min_time seconds, found by doubling it
+    from 1, and the seconds taken by that many calls.
+    """
+    number = 1
+    while (elapsed := time_calls(fn, args, kwargs, number)) < min_time:
+        number *= 2
+    return number, elapsed
+
+
+def peak_bytes(fn, args=(), kwargs=None):
+    """The peak memory traced while making one call."""
+    kwargs = kwargs or {}
+    tracemalloc.start()
+    try:
+        fn(*args, **kwargs)  # warms up caches, so that they are not counted
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        fn(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - current
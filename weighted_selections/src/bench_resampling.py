@@ -0,0 +1,124 @@
+"""
+Benchmarks of the resampling algorithms.
+
+Every algorithm is timed for several numbers of samples n, and numbers of selections
+k given as fractions of n. Each case is warmed up, then timed in several trials, each
+trial making as many calls as take at least min_time seconds. The suite reports the
+median time per call and its interquartile range over the trials, and can save the
+results as JSON:
+
+    python -m weighted_selections.src.bench_resampling --sizes 1000 100000 --output results.json
+"""
+import argparse
+import json
+import sys
+from random import Random, choices
+from statistics import median, quantiles
+
+from weighted_selections.src.resampling import (
+    alias_choices, gaussian_pdf, my_choices_fast, my_choices_slow, numpy_alias_choices, numpy_choices,
+    numpy_choices_fast, numpy_residual_choices, numpy_stratified_choices, numpy_systematic_choices,
+    residual_choices, stratified_choices, systematic_choices)
+from utils.benchmarking import calibrate, time_calls
+
+ALGORITHMS = {
+    'choices': choices,
+    'numpy_choices': numpy_choices,
+    'my_choices_slow': my_choices_slow,
+    'my_choices_fast': my_choices_fast,
+    'numpy_choices_fast': numpy_choices_fast,
+    'systematic_choices': systematic_choices,
+    'stratified_choices': stratified_choices,
+    'residual_choices': residual_choices,
+    'numpy_systematic_choices': numpy_systematic_choices,
+    'numpy_stratified_choices': numpy_stratified_choices,
+    'numpy_residual_choices': numpy_residual_choices,
+    'alias_choices': alias_choices,
+    'numpy_alias_choices': numpy_alias_choices,
+}
+
+
+def make_inputs(n, seed=0):
+    """The samples and weights of a case, as in compare_choices_algos."""
+    rng = Random(f'{n}/{seed}')
+    samples = [rng.gauss(5.2, 6.5) for _ in range(n)]
+    weights = [gaussian_pdf(x, μ=2.6, σ=3.5) for x in samples]
+    return samples, weights
+
+
+def time_per_call(fn, args, kwargs, min_time, trials, warmup):
+    """The time per call of each trial, after warmup calls."""
+    for _ in range(warmup):
+        fn(*args, **kwargs)
+    number, elapsed = calibrate(fn, args, kwargs, min_time)
+    times = [elapsed / number]
+    for _ in range(trials - 1):
+        times.append(time_calls(fn, args, kwargs, number) / number)
+    return times
+
+
+def summarize(times):
+    if len(times) < 2:
+        return times[0], 0.0
+    q1, _, q3 = quantiles(times, n=4, method='inclusive')
+    return median(times), q3 - q1
+
+
+def run_case(algorithm, n, k, min_time=0.05, trials=5, warmup=1, inputs=None):
+    samples, weights = inputs or make_inputs(n)
+    times = time_per_call(ALGORITHMS[algorithm], (samples, weights), {'k': k}, min_time, trials, warmup)
+    median_time, iqr = summarize(times)
+    return {
+        'algorithm': algorithm,
+        'n': n,
+        'k': k,
+        'trials': len(times),
+        'median': median_time,
+        'iqr': iqr,
+        'min': min(times),
+        'times': times,
+    }
+
+
+def run_suite(algorithms=tuple(ALGORITHMS), sizes=(100, 10_000, 1_000_000), k_ratios=(1.0,),
+              min_time=0.05, trials=5, warmup=1, report=print):
+    results = []
+    for n in sizes:
+        inputs = make_inputs(n)
+        for ratio in k_ratios:
+            k = max(1, round(n * ratio))
+            for algorithm in algorithms:
+                result = run_case(algorithm, n, k, min_time, trials, warmup, inputs)
+                results.append(result)
+                if report:
+                    report(format_result(result))
+    return results
+
+
+def format_result(result):
+    return (f"{result['algorithm']:>24} n={result['n']:<9,d} k={result['k']:<9,d}: "
+            f"median {result['median']:.6f} s, IQR {result['iqr']:.6f} s over {result['trials']} trials")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the resampling algorithms.')
+    parser.add_argument('--algorithms', nargs='+', choices=list(ALGORITHMS), default=list(ALGORITHMS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[100, 10_000, 1_000_000],
+                        help='numbers of samples')
+    parser.add_argument('--k-ratios', nargs='+', type=float, default=[1.0],
+                        help='numbers of selections, as fractions of the number of samples')
+    parser.add_argument('--min-time', type=float, default=0.05, help='seconds per trial')
+    parser.add_argument('--trials', type=int, default=5, help='timed trials per case')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed calls before the trials')
+    parser.add_argument('--output', help='save the results to this JSON file')
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.algorithms, args.sizes, args.k_ratios, args.min_time, args.trials, args.warmup)
+    if args.output:
+        with open(args.output, mode='w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+from array import array
+from random import random
+
+
+class DynamicWeightedSampler:
+    """
+    Weighted selection with replacement from a collection whose weights change.
+
+    The weights are kept in a Fenwick tree, an array('d') where entry i (1-based) holds
+    the sum of the weights of the items i - (i & -i) + 1 to i. Changing, appending or
+    removing a weight costs O(log n), instead of the O(n) it takes to rebuild weights_acc
+    in resampling.py, and each selection is a descent of the tree in O(log n).
+
+    Removing an item moves the last item into its place, so that the indices of all the
+    other items are unchanged.
+    """
+
+    def __init__(self, samples=(), weights=()):
+        self.samples = list(samples)
+        self._weights = array('d', weights)
+        if len(self.samples) != len(self._weights):
+            raise ValueError('samples and weights must have the same length')
+        if any(w < 0 for w in self._weights):
+            raise ValueError('weights must not be negative')
+        # Builds the tree in O(n): each entry adds its sum to its parent's
+        tree = array('d', self._weights)
+        n = len(tree)
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                tree[parent - 1] += tree[i - 1]
+        self._tree = tree
+
+    def __len__(self):
+        return len(self._weights)
+
+    def weight(self, i):
+        return self._weights[i]
+
+    @property
+    def total(self):
+        return self._prefix_sum(len(self._tree))
+
+    def _prefix_sum(self, i):
+        # The sum of the first i weights
+        tree = self._tree
+        s = 0.0
+        while i > 0:
+            s += tree[i - 1]
+            i &= i - 1
+        return s
+
+    def update(self, i, weight):
+        if weight < 0:
+            raise ValueError('weights must not be negative')
+        i = range(len(self))[i]  # the tree walk needs a non-negative index
+        delta = weight - self._weights[i]
+        self._weights[i] = weight
+        tree = self._tree
+        n = len(tree)
+        i += 1
+        while i <= n:
+            tree[i - 1] += delta
+            i += i & -i
+
+    def append(self, sample, weight):
+        if weight < 0:
+            raise ValueError('weights must not be negative')
+        self.samples.append(sample)
+        self._weights.append(weight)
+        # The new entry covers the weights i - (i & -i) + 1 to i, the new one included
+        i = len(self._weights)
+        self._tree.append(weight + self._prefix_sum(i - 1) - self._prefix_sum(i - (i & -i)))
+
+    def remove(self, i):
+        """Remove the item at index i, and return its sample. The last item takes its index."""
+        i = range(len(self))[i]
+        last = len(self._weights) - 1
+        sample = self.samples[i]
+        if i != last:
+            self.samples[i] = self.samples[last]
+            self.update(i, self._weights[last])
+        # No other entry of the tree includes the last weight
+        self.samples.pop()
+        self._weights.pop()
+        self._tree.pop()
+        return sample
+
+    def _find(self, u):
+        # The index of the first item whose prefix sum exceeds u
+        tree = self._tree
+        n = len(tree)
+        pos = 0
+        step = 1 << n.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= n and tree[nxt - 1] <= u:
+                pos = nxt
+                u -= tree[nxt - 1]
+            step >>= 1
+        return min(pos, n - 1)
+
+    def sample_indices(self, k=1):
+        total = self.total
+        if not total > 0:
+            raise ValueError('the total weight must be positive')
+        return [self._find(random() * total) for _ in range(k)]
+
+    def sample(self, k=1):
+        """k samples selected with replacement, with probabilities proportional to the weights."""
+        samples = self.samples
+        return [samples[i] for i in self.sample_indices(k)]
@@ -0,0 +1,122 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from weighted_selections.src.resampling import gaussian_logpdf, numpy_choices_fast, weights_from_log
+from weighted_selections.src.timethis import timeblock
+
+
+def _attach(name, dtype, length):
+    shm = SharedMemory(name=name)
+    return shm, np.ndarray((length,), dtype=dtype, buffer=shm.buf)
+
+
+def _prefix_sums(weights_name, n, start, stop):
+    # Replaces the shard's weights by their prefix sums, and returns the shard's total
+    shm, weights = _attach(weights_name, np.float64, n)
+    try:
+        np.cumsum(weights[start:stop], out=weights[start:stop])
+        return float(weights[stop - 1])
+    finally:
+        del weights
+        shm.close()
+
+
+def _draw(weights_name, n, out_name, k, start, stop, out_start, count, seed):
+    # Draws the shard's share of the sorted events, as my_choices_fast does, and writes
+    # the indices of the selected samples to out[out_start:out_start + count]
+    shm, weights_acc = _attach(weights_name, np.float64, n)
+    out_shm, out = _attach(out_name, np.int64, k)
+    try:
+        acc = weights_acc[start:stop]
+        events = np.cumsum(np.random.default_rng(seed).exponential(size=count + 1))
+        events = events[:-1] * (acc[-1] / events[-1])
+        i = np.searchsorted(acc, events, side='right')
+        out[out_start:out_start + count] = np.minimum(i, stop - start - 1) + start
+    finally:
+        del weights_acc, acc, out
+        shm.close()
+        out_shm.close()
+
+
+class ParallelResampler:
+    """
+    Resampling spread over a pool of processes.
+
+    The weights are split in one shard per worker. The workers compute the prefix sums
+    of their shards in shared memory, and the parent turns the shard totals into the
+    number of events that fall in each shard, a multinomial draw. Each worker then draws
+    its events, sorted, with exponential spacings, and writes the selected indices to
+    its slice of a shared output array. Only shared memory names and a few numbers are
+    sent to the workers. The result has the same distribution as my_choices_fast, and
+    is also sorted by index. Instances have the (samples, weights, k) signature of the
+    other resampling functions, and should be closed, or used in a with statement, to
+    shut down the pool.
+    """
+
+    def __init__(self, workers=None, rng=None):
+        self.workers = workers or os.cpu_count()
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.executor = ProcessPoolExecutor(self.workers)
+
+    def sample_indices(self, weights, k=1):
+        n = len(weights)
+        bounds = np.linspace(0, n, min(self.workers, n) + 1).astype(np.int64).tolist()
+        shards = [(start, stop) for start, stop in zip(bounds, bounds[1:]) if start < stop]
+        weights_shm = SharedMemory(create=True, size=max(n, 1) * 8)
+        out_shm = SharedMemory(create=True, size=max(k, 1) * 8)
+        try:
+            np.ndarray((n,), dtype=np.float64, buffer=weights_shm.buf)[:] = weights
+            totals = [future.result() for future in
+                      [self.executor.submit(_prefix_sums, weights_shm.name, n, start, stop)
+                       for start, stop in shards]]
+            counts = self.rng.multinomial(k, np.asarray(totals) / sum(totals))
+            out_starts = np.concatenate(([0], np.cumsum(counts)[:-1])).tolist()
+            seeds = self.rng.spawn(len(shards))
+            futures = [self.executor.submit(_draw, weights_shm.name, n, out_shm.name, k, start, stop,
+                                            out_start, count, seed)
+                       for (start, stop), out_start, count, seed in zip(shards, out_starts, counts.tolist(), seeds)
+                       if count]
+            for future in futures:
+                future.result()
+            return np.ndarray((k,), dtype=np.int64, buffer=out_shm.buf).copy()
+        finally:
+            weights_shm.close()
+            weights_shm.unlink()
+            out_shm.close()
+            out_shm.unlink()
+
+    def __call__(self, samples, weights, k=1):
+        return np.asarray(samples)[self.sample_indices(weights, k)]
+
+    def close(self):
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def parallel_choices(samples, weights, k=1, workers=None, rng=None):
+    with ParallelResampler(workers, rng) as resampler:
+        return resampler(samples, weights, k)
+
+
+def compare_parallel_choices(num_samples, workers=None):
+    rng = np.random.default_rng()
+    samples = rng.normal(5.2, 6.5, size=num_samples)
+    weights = weights_from_log(gaussian_logpdf(samples, μ=2.6, σ=3.5))
+    with ParallelResampler(workers) as resampler:
+        resampler(samples, weights, k=num_samples)  # starts the worker processes
+        with timeblock(f'Using ParallelResampler with {resampler.workers} workers'):
+            resampler(samples, weights, k=num_samples)
+    with timeblock('Using numpy_choices_fast()'):
+        numpy_choices_fast(samples, weights, k=num_samples)
+
+
+if __name__ == "__main__":
+    compare_parallel_choices(10_000_000)
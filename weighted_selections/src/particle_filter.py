@@ -0,0 +1,107 @@
+from inspect import signature
+from math import log, sqrt
+
+import numpy as np
+
+from weighted_selections.src.resampling import gaussian_logpdf, logsumexp, numpy_systematic_choices, weights_from_log
+from weighted_selections.src.timethis import timethis
+
+
+class ParticleFilter:
+    """
+    A bootstrap particle filter over NumPy arrays of particles and log-weights.
+
+    Each step moves the particles with transition(particles, rng), which returns the new
+    particles, then adds log_likelihood(particles, observation) to the log-weights. When
+    the effective sample size falls below ess_threshold * n, the particles are resampled
+    with resampling(samples, weights, k), any function with the signature of the ones in
+    resampling.py, and the weights are reset to 1 / n. Resampling functions that take
+    an rng argument get the filter's, so that a seeded rng makes the whole run reproducible.
+    """
+
+    def __init__(self, particles, transition, log_likelihood, *,
+                 resampling=numpy_systematic_choices, ess_threshold=0.5, rng=None):
+        self.particles = np.asarray(particles, dtype=float)
+        n = len(self.particles)
+        self.log_weights = np.full(n, -log(n))
+        self.transition = transition
+        self.log_likelihood = log_likelihood
+        self.resampling = resampling
+        self.ess_threshold = ess_threshold
+        self.rng = np.random.default_rng() if rng is None else rng
+        self._resampling_kwargs = {'rng': self.rng} if _takes_rng(resampling) else {}
+        self.resample_count = 0
+
+    @property
+    def weights(self):
+        return np.exp(self.log_weights)
+
+    def ess(self):
+        """The effective sample size, 1 / sum(w ** 2) for the normalized weights w."""
+        return np.exp(-logsumexp(2 * self.log_weights))
+
+    def predict(self):
+        self.particles = self.transition(self.particles, self.rng)
+
+    def update(self, observation):
+        self.log_weights += self.log_likelihood(self.particles, observation)
+        self.log_weights -= logsumexp(self.log_weights)
+
+    def resample(self):
+        n = len(self.particles)
+        indices = self.resampling(np.arange(n), weights_from_log(self.log_weights), k=n,
+                                  **self._resampling_kwargs)
+        self.particles = self.particles[np.asarray(indices)]
+        self.log_weights = np.full(n, -log(n))
+        self.resample_count += 1
+
+    def step(self, observation):
+        self.predict()
+        self.update(observation)
+        if self.ess() < self.ess_threshold * len(self.particles):
+            self.resample()
+
+    def run(self, observations):
+        """Filter a stream of observations, yielding the posterior mean and σ after each step."""
+        for observation in observations:
+            self.step(observation)
+            yield self.mean_and_sigma()
+
+    def mean_and_sigma(self):
+        # Averages over the particles, the first axis, whatever the shape of the state
+        w = self.weights
+        mean = np.average(self.particles, axis=0, weights=w)
+        variance = np.average((self.particles - mean) ** 2, axis=0, weights=w)
+        return mean, np.sqrt(variance)
+
+
+def _takes_rng(resampling):
+    try:
+        return 'rng' in signature(resampling).parameters
+    except (TypeError, ValueError):  # no signature, as for some builtins
+        return False
+
+
+def random_walk(σ):
+    """A transition function that adds N(0, σ²) noise to each particle."""
+    return lambda particles, rng: particles + rng.normal(0.0, σ, size=particles.shape)
+
+
+def gaussian_log_likelihood(σ):
+    """A log-likelihood function for observations of the state with N(0, σ²) noise."""
+    return lambda particles, y: gaussian_logpdf(particles, y, σ)
+
+
+@timethis
+def track_random_walk(num_particles, num_steps, q=1.0, r=3.0):
+    rng = np.random.default_rng()
+    states = np.cumsum(rng.normal(0.0, q, size=num_steps))
+    observations = states + rng.normal(0.0, r, size=num_steps)
+    pf = ParticleFilter(rng.normal(0.0, r, size=num_particles), random_walk(q), gaussian_log_likelihood(r), rng=rng)
+    squared_errors = sum((mean - x) ** 2 for (mean, _), x in zip(pf.run(observations), states))
+    print(f"RMS error = {sqrt(squared_errors / num_steps):.3f} (observation σ = {r}), "
+          f"resampled {pf.resample_count} times in {num_steps} steps")
+
+
+if __name__ == "__main__":
+    track_random_walk(100_000, 1_000)
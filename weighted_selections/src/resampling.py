@@ -1,10 +1,10 @@
+from functools import wraps
 from math import sqrt, exp, pi as π, log as ln
-from random import choices, gauss, uniform
+from random import choices, gauss, random, uniform
 
-import matplotlib.pyplot as plt
 import numpy as np
 
-from weighted_selections.src.timethis import timethis, timeblock
+from weighted_selections.src.timethis import timethis
 
 
 # In Python 3.6: random.choices(samples, weights, k = 1)
@@ -54,13 +54,208 @@ def my_choices_fast(samples, weights, k=1):
     return res
 
 
+def numpy_choices_fast(samples, weights, k=1, rng=None):
+    """
+    my_choices_fast on NumPy: the sorted events are cumulative sums of exponential
+    spacings, mapped to samples with a binary search in the cumulative weights.
+    Pass a numpy.random.Generator as rng for reproducible results.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    weights_acc = np.cumsum(weights)
+    events = np.cumsum(rng.exponential(size=k + 1))
+    events = events[:-1] * (weights_acc[-1] / events[-1])
+    # The first i for which weights_acc[i] >= e, as in my_choices_fast
+    i = np.searchsorted(weights_acc, events)
+    return np.asarray(samples)[np.minimum(i, len(weights_acc) - 1)]
+
+
+def _select(samples, weights, events):
+    # One pass over the weights for sorted events in [0, sum(weights)):
+    # the sample whose cumulative weight first exceeds e is selected for e
+    i, acc, res = 0, weights[0], []
+    last = len(weights) - 1
+    for e in events:
+        while acc <= e and i < last:
+            i += 1
+            acc += weights[i]
+        res.append(samples[i])
+    return res
+
+
+def systematic_choices(samples, weights, k=1):
+    """Systematic resampling: k evenly spaced events, with a single random offset."""
+    step = sum(weights) / k
+    offset = uniform(0, step)
+    return _select(samples, weights, (offset + j * step for j in range(k)))
+
+
+def stratified_choices(samples, weights, k=1):
+    """Stratified resampling: one random event in each of k equal strata."""
+    step = sum(weights) / k
+    return _select(samples, weights, ((j + random()) * step for j in range(k)))
+
+
+def residual_choices(samples, weights, k=1):
+    """
+    Residual resampling: each sample is first copied as many whole times as its share
+    of k, then the remaining samples are drawn from the fractional parts.
+    """
+    total = sum(weights)
+    res, residuals = [], []
+    for s, w in zip(samples, weights):
+        expected = w * k / total
+        copies = int(expected)
+        res.extend([s] * copies)
+        residuals.append(expected - copies)
+    if len(res) < k:
+        res.extend(my_choices_fast(samples, residuals, k - len(res)))
+    return res
+
+
+def _numpy_select(samples, weights_acc, events):
+    i = np.searchsorted(weights_acc, events, side='right')
+    return np.asarray(samples)[np.minimum(i, len(weights_acc) - 1)]
+
+
+def numpy_systematic_choices(samples, weights, k=1, rng=None):
+    rng = np.random.default_rng() if rng is None else rng
+    weights_acc = np.cumsum(weights)
+    return _numpy_select(samples, weights_acc, (rng.random() + np.arange(k)) * (weights_acc[-1] / k))
+
+
+def numpy_stratified_choices(samples, weights, k=1, rng=None):
+    rng = np.random.default_rng() if rng is None else rng
+    weights_acc = np.cumsum(weights)
+    return _numpy_select(samples, weights_acc, (rng.random(k) + np.arange(k)) * (weights_acc[-1] / k))
+
+
+def numpy_residual_choices(samples, weights, k=1, rng=None):
+    rng = np.random.default_rng() if rng is None else rng
+    expected = np.asarray(weights, dtype=float) * (k / np.sum(weights))
+    copies = np.floor(expected).astype(np.int64)
+    indices = np.repeat(np.arange(len(copies)), copies)
+    m = k - len(indices)
+    if m > 0:
+        residuals_acc = np.cumsum(expected - copies)
+        extra = np.searchsorted(residuals_acc, rng.random(m) * residuals_acc[-1], side='right')
+        indices = np.concatenate((indices, np.minimum(extra, len(copies) - 1)))
+    return np.asarray(samples)[indices]
+
+
+class AliasSampler:
+    """
+    Walker's alias method, with the table built by Vose's algorithm.
+
+    Building the table takes O(n) time. After that, each sample takes O(1) time: pick a
+    slot uniformly, then either keep it or take its alias. An instance may be passed as
+    the resampling argument of particle_filter_step. The table is rebuilt only when it
+    is called with a different weights list than the last one, so a list of weights
+    must not be modified after it has been passed in.
+    """
+
+    def __init__(self, weights=None):
+        self.weights = None
+        if weights is not None:
+            self.build(weights)
+
+    def build(self, weights):
+        n = len(weights)
+        total = sum(weights)
+        prob = [w * n / total for w in weights]
+        alias = list(range(n))
+        small = [i for i, p in enumerate(prob) if p < 1]
+        large = [i for i, p in enumerate(prob) if p >= 1]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            alias[s] = l
+            prob[l] -= 1 - prob[s]
+            (small if prob[l] < 1 else large).append(l)
+        for i in small + large:  # left over only because of rounding errors
+            prob[i] = 1.0
+        self.weights, self.prob, self.alias = weights, prob, alias
+
+    def sample_indices(self, k=1):
+        n, prob, alias = len(self.prob), self.prob, self.alias
+        res = []
+        for _ in range(k):
+            u = random() * n
+            i = int(u)
+            res.append(i if u - i < prob[i] else alias[i])
+        return res
+
+    def __call__(self, samples, weights, k=1):
+        if weights is not self.weights:
+            self.build(weights)
+        return [samples[i] for i in self.sample_indices(k)]
+
+
+class NumpyAliasSampler(AliasSampler):
+    """AliasSampler with the table in NumPy arrays, drawing all k samples at once."""
+
+    def __init__(self, weights=None, rng=None):
+        self.rng = np.random.default_rng() if rng is None else rng
+        super().__init__(weights)
+
+    def build(self, weights):
+        w = np.asarray(weights, dtype=float)
+        n = len(w)
+        prob = w * (n / w.sum())
+        alias = np.arange(n)
+        small = np.flatnonzero(prob < 1)
+        large = np.flatnonzero(prob >= 1)
+        while small.size and large.size:
+            # Pair off as many small and large slots as possible at once, as long as that
+            # is a good fraction of them, so that the passes take O(n) time in all
+            m = min(small.size, large.size)
+            if 8 * m < small.size + large.size:
+                break
+            s, l = small[:m], large[:m]
+            alias[s] = l
+            prob[l] -= 1 - prob[s]
+            small = np.concatenate((small[m:], l[prob[l] < 1]))
+            large = np.concatenate((large[m:], l[prob[l] >= 1]))
+        if small.size and large.size:
+            # The rest, one pair at a time as in AliasSampler, e.g. when a few weights dominate
+            p, a = prob.tolist(), alias.tolist()
+            small, large = small.tolist(), large.tolist()
+            while small and large:
+                s, l = small.pop(), large.pop()
+                a[s] = l
+                p[l] -= 1 - p[s]
+                (small if p[l] < 1 else large).append(l)
+            prob, alias = np.array(p), np.array(a)
+        prob[small] = 1.0  # left over only because of rounding errors
+        prob[large] = 1.0
+        self.weights, self.prob, self.alias = weights, prob, alias
+
+    def sample_indices(self, k=1):
+        n = len(self.prob)
+        i = self.rng.integers(n, size=k)
+        return np.where(self.rng.random(k) < self.prob[i], i, self.alias[i])
+
+    def __call__(self, samples, weights, k=1):
+        if weights is not self.weights:
+            self.build(weights)
+        return np.asarray(samples)[self.sample_indices(k)]
+
+
+def alias_choices(samples, weights, k=1):
+    return AliasSampler(weights)(samples, weights, k)
+
+
+def numpy_alias_choices(samples, weights, k=1):
+    return NumpyAliasSampler(weights)(samples, weights, k)
+
+
 def show_uniform_dist(sample_size, bins):
+    import matplotlib.pyplot as plt
     selection = [uniform(0, sample_size) for _ in range(sample_size)]
     plt.hist(selection, bins)
     plt.show()
 
 
 def show_uniform_diffs_dist(sample_size, bins):
+    import matplotlib.pyplot as plt
     uniform_selection = [uniform(0, sample_size) for _ in range(sample_size)]
     uniform_selection.sort()
     diffs_selection = [x - y for x, y in zip(uniform_selection[1:], uniform_selection)]
@@ -69,11 +264,14 @@ def show_uniform_diffs_dist(sample_size, bins):
 
 
 def show_exponential_dist(sample_size, bins):
+    import matplotlib.pyplot as plt
     plt.hist([-ln(uniform(0, 1)) for _ in range(sample_size + 1)], bins)
     plt.show()
 
 
 def show_exponential_sum_dist(sample_size, bins):
+    import matplotlib.pyplot as plt
+
     def gen_events():
         e = 0
         for _ in range(sample_size):
@@ -91,22 +289,52 @@ def gaussian_pdf(x, μ=0.0, σ=1.0):
     return exp(-d * d / (2 * var)) / sqrt(2 * π * var)
 
 
+def gaussian_logpdf(x, μ=0.0, σ=1.0):
+    """The log of gaussian_pdf, for a number or, element-wise, for an array."""
+    z = (np.asarray(x) - μ) / σ
+    return -0.5 * z * z - (ln(σ) + 0.5 * ln(2 * π))
+
+
+def logsumexp(log_weights):
+    """log(sum(exp(log_weights))), shifted by the maximum so that exp cannot overflow or underflow."""
+    log_weights = np.asarray(log_weights)
+    m = np.max(log_weights)
+    if not np.isfinite(m):
+        return m
+    return m + np.log(np.sum(np.exp(log_weights - m)))
+
+
+def weights_from_log(log_weights):
+    """Weights proportional to exp(log_weights), scaled so that the largest is 1."""
+    log_weights = np.asarray(log_weights)
+    return np.exp(log_weights - np.max(log_weights))
+
+
+def log_resampling(resampling):
+    """
+    Adapt a resampling function to take log-weights instead of weights. The weights
+    are computed with a single vectorized exp, after shifting the log-weights by their
+    maximum, so that narrow likelihoods do not underflow to all zeros.
+    """
+    @wraps(resampling)
+    def wrapper(samples, log_weights, k=1, **kwargs):
+        weights = weights_from_log(log_weights)
+        if not isinstance(samples, np.ndarray):
+            weights = weights.tolist()
+        return resampling(samples, weights, k, **kwargs)
+
+    return wrapper
+
+
 def compare_choices_algos(num_samples, repeats):
-    samples = [gauss(5.2, 6.5) for _ in (range(num_samples))]
-    weights = [gaussian_pdf(x, μ=2.6, σ=3.5) for x in samples]
+    from weighted_selections.src.bench_resampling import ALGORITHMS, run_suite
 
-    for description, algo in (('Using Python 3.6 choices()', choices),
-                              ('Using numpy.random.choice()', numpy_choices),
-                              ('Using my_choices_slow()', my_choices_slow),
-                              ('Using my_choices_fast()', my_choices_fast)):
-        with timeblock(description):
-            for _ in range(repeats):
-                algo(samples, weights, k=num_samples)
+    run_suite(tuple(ALGORITHMS), sizes=(num_samples,), min_time=0.0, trials=repeats)
 
 
 @timethis
 def particle_filter_step(samples_pre, *, resampling):
-    weights = [gaussian_pdf(x, μ=2.6, σ=3.5) for x in samples_pre]
+    weights = weights_from_log(gaussian_logpdf(samples_pre, μ=2.6, σ=3.5)).tolist()
     print("Prior: μ = %.3f, σ = %.3f" % mean_and_sigma(samples_pre))
     samples_post = resampling(samples_pre, weights, k=len(samples_pre))
     print("Posterior: μ' = %.3f, σ' = %.3f" % mean_and_sigma(samples_post))
@@ -151,6 +379,24 @@ def compare_particle_filter_step(num_samples):
     print("==============================")
     particle_filter_step(samples_pre, resampling=my_choices_fast)
 
+    print("\nRun test using numpy_choices_fast")
+    print("=================================")
+    particle_filter_step(samples_pre, resampling=numpy_choices_fast)
+
+    for resampling in (systematic_choices, stratified_choices, residual_choices,
+                       numpy_systematic_choices, numpy_stratified_choices, numpy_residual_choices):
+        title = f"Run test using {resampling.__name__}"
+        print(f"\n{title}\n{'=' * len(title)}")
+        particle_filter_step(samples_pre, resampling=resampling)
+
+    print("\nRun test using AliasSampler")
+    print("===========================")
+    particle_filter_step(samples_pre, resampling=AliasSampler())
+
+    print("\nRun test using NumpyAliasSampler")
+    print("================================")
+    particle_filter_step(samples_pre, resampling=NumpyAliasSampler())
+
 
 if __name__ == "__main__":
     compare_particle_filter_step(500_000)
@@ -0,0 +1,102 @@
+from heapq import heappush, heapreplace
+from itertools import count
+from math import exp, log, log1p
+from random import random, uniform
+
+
+class WeightedReservoir:
+    """
+    Weighted random sampling without replacement over a stream, by Efraimidis and
+    Spirakis' algorithm A-ExpJ.
+
+    Each item gets the key u ** (1 / w), for a uniform u, and the reservoir keeps the k
+    items with the largest keys. Instead of drawing a key for every item, the algorithm
+    draws how much weight to skip before the next item that enters the reservoir, so
+    random numbers are only drawn for the O(k log(n / k)) items that enter it. Keys are
+    kept as logarithms, which do not underflow for large weights. Memory is O(k).
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []  # (log key, tie breaker, sample), smallest key first
+        self._tie = count()
+        self._skip = 0.0  # weight to skip before the next item enters the reservoir
+
+    def add(self, sample, weight):
+        if weight <= 0 or self.k == 0:
+            return
+        heap = self._heap
+        if len(heap) < self.k:
+            heappush(heap, (log(1.0 - random()) / weight, next(self._tie), sample))
+            if len(heap) == self.k:
+                self._draw_skip()
+            return
+        self._skip -= weight
+        if self._skip <= 0:
+            # The new key is drawn above the threshold: u in (t ** weight, 1)
+            t_w = exp(heap[0][0] * weight)
+            heapreplace(heap, (log(uniform(t_w, 1.0)) / weight, next(self._tie), sample))
+            self._draw_skip()
+
+    def _draw_skip(self):
+        self._skip = log(1.0 - random()) / self._heap[0][0]
+
+    def extend(self, pairs):
+        for sample, weight in pairs:
+            self.add(sample, weight)
+        return self
+
+    def samples(self):
+        """The samples in the reservoir, those with the largest keys first."""
+        return [sample for _, _, sample in sorted(self._heap, reverse=True)]
+
+
+class WeightedReservoirWithReplacement:
+    """
+    Weighted random sampling with replacement over a stream: k independent reservoirs of
+    one item each. After n items, each reservoir holds item i with probability w_i / W,
+    where W is the total weight, because item i replaces the content of each reservoir
+    with probability w_i / W_i, W_i being the total weight up to item i. The reservoirs
+    that an item replaces are found by geometric jumps, so an item costs O(1 + k w_i / W_i)
+    rather than O(k). Memory is O(k).
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.total = 0.0
+        self._reservoirs = [None] * k
+
+    def add(self, sample, weight):
+        if weight <= 0:
+            return
+        self.total += weight
+        p = weight / self.total
+        if p >= 1.0:
+            self._reservoirs = [sample] * self.k
+            return
+        if p == 0.0:
+            return
+        log_q = log1p(-p)
+        j = log(1.0 - random()) / log_q
+        while j < self.k:
+            j = int(j)
+            self._reservoirs[j] = sample
+            j += 1 + log(1.0 - random()) / log_q
+
+    def extend(self, pairs):
+        for sample, weight in pairs:
+            self.add(sample, weight)
+        return self
+
+    def samples(self):
+        return self._reservoirs[:] if self.total > 0 else []
+
+
+def reservoir_sample(pairs, k=1):
+    """k distinct samples from an iterable of (sample, weight) pairs, without replacement."""
+    return WeightedReservoir(k).extend(pairs).samples()
+
+
+def reservoir_choices(pairs, k=1):
+    """k samples from an iterable of (sample, weight) pairs, with replacement, like random.choices."""
+    return WeightedReservoirWithReplacement(k).extend(pairs).samples()
@@ -1,27 +1,207 @@
 # timethis.py
-# Copied from The Python Cookbook
+# timethis and timeblock are adapted from The Python Cookbook. Besides printing, they
+# record each measurement in a TimingRegistry, which can be exported as JSON or CSV.
+import csv
+import io
+import json
+import math
 import time
+import tracemalloc
 from functools import wraps
 from contextlib import contextmanager
+from threading import Lock
 
 
-def timethis(func):
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        start = time.perf_counter()
-        r = func(*args, **kwargs)
-        end = time.perf_counter()
-        print(f'{func.__module__}.{func.__name__} : {end - start}')
-        return r
-    return wrapper
+class LogHistogram:
+    """
+    A streaming sketch of a distribution of positive values, for percentiles.
+
+    Values are counted in buckets whose bounds grow geometrically, by a factor of
+    (1 + accuracy) / (1 - accuracy), so that any percentile is estimated within the
+    given relative accuracy, in memory that grows with the log of the range of values.
+    """
+
+    def __init__(self, accuracy=0.01):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value <= 0:
+            self.zeros += 1
+            return
+        i = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[i] = self.buckets.get(i, 0) + 1
+
+    def percentile(self, p):
+        if not self.count:
+            return math.nan
+        rank = p / 100 * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if rank < seen:
+                # The value in the middle of the bucket (gamma ** (i - 1), gamma ** i]
+                return 2 * self.gamma ** i / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class TimingStats:
+    """The measurements recorded under one label."""
+
+    def __init__(self, label):
+        self.label = label
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.sketch = LogHistogram()
+        self.cpu_total = None
+        self.peak_bytes = None
+
+    def add(self, elapsed, cpu=None, peak=None):
+        self.count += 1
+        self.total += elapsed
+        self.min = min(self.min, elapsed)
+        self.max = max(self.max, elapsed)
+        self.sketch.add(elapsed)
+        if cpu is not None:
+            self.cpu_total = (self.cpu_total or 0.0) + cpu
+        if peak is not None:
+            self.peak_bytes = max(self.peak_bytes or 0, peak)
+
+    def as_dict(self):
+        return {
+            'label': self.label,
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else math.nan,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.sketch.percentile(50),
+            'p90': self.sketch.percentile(90),
+            'p99': self.sketch.percentile(99),
+            'cpu_total': self.cpu_total,
+            'peak_bytes': self.peak_bytes,
+        }
+
+
+class TimingRegistry:
+    """Timing statistics by label. Recording a measurement costs a dict lookup and a few additions."""
+
+    def __init__(self):
+        self.stats = {}
+        self._lock = Lock()
+
+    def record(self, label, elapsed, cpu=None, peak=None):
+        with self._lock:
+            stats = self.stats.get(label)
+            if stats is None:
+                stats = self.stats[label] = TimingStats(label)
+            stats.add(elapsed, cpu, peak)
+
+    def __getitem__(self, label):
+        return self.stats[label]
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+
+    def as_dicts(self):
+        with self._lock:
+            return [stats.as_dict() for stats in self.stats.values()]
+
+    def to_json(self, file=None):
+        """Write the statistics to file, a path or a text file, or return them as a string."""
+        text = json.dumps(self.as_dicts(), indent=2)
+        return _write(text, file)
+
+    def to_csv(self, file=None):
+        rows = self.as_dicts()
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=list(TimingStats('').as_dict()))
+        writer.writeheader()
+        writer.writerows(rows)
+        return _write(out.getvalue(), file)
+
+
+def _write(text, file):
+    if file is None:
+        return text
+    if isinstance(file, str):
+        with open(file, mode='w', newline='') as f:
+            f.write(text)
+    else:
+        file.write(text)
+
+
+registry = TimingRegistry()
+
+
+# The peaks of the enclosing blocks measuring memory, innermost last. Each block resets the
+# peak of tracemalloc, so it folds the peak so far into that of the block around it.
+_peaks = []
+
+
+def _fold_peak():
+    peak = tracemalloc.get_traced_memory()[1]
+    if _peaks:
+        _peaks[-1] = max(_peaks[-1], peak)
+    return peak
 
 
 @contextmanager
-def timeblock(label):
+def _measure(label, echo, cpu, memory, registry):
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if memory:
+        if started_tracing:
+            tracemalloc.start()
+        _fold_peak()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        _peaks.append(base)
+    cpu_start = time.process_time() if cpu else None
     start = time.perf_counter()
     try:
         yield
     finally:
         end = time.perf_counter()
-        print(f'{label} : {end - start}')
+        cpu_time = time.process_time() - cpu_start if cpu else None
+        peak = None
+        if memory:
+            _fold_peak()
+            peak = _peaks.pop()
+            if _peaks:
+                _peaks[-1] = max(_peaks[-1], peak)
+            peak -= base
+            if started_tracing:
+                tracemalloc.stop()
+        if registry is not None:
+            registry.record(label, end - start, cpu_time, peak)
+        if echo:
+            print(f'{label} : {end - start}')
+
+
+def timethis(func=None, *, echo=True, cpu=False, memory=False, registry=registry):
+    """
+    Time each call to func, under the label module.name. Can be used as @timethis, or
+    with options, as @timethis(echo=False, cpu=True, memory=True).
+    """
+    if func is None:
+        return lambda func: timethis(func, echo=echo, cpu=cpu, memory=memory, registry=registry)
+    label = f'{func.__module__}.{func.__name__}'
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with _measure(label, echo, cpu, memory, registry):
+            return func(*args, **kwargs)
+    return wrapper
+
 
+def timeblock(label, *, echo=True, cpu=False, memory=False, registry=registry):
+    return _measure(label, echo, cpu, memory, registry)
@@ -0,0 +1,27 @@
+import random
+from collections import Counter
+
+import pytest
+
+WEIGHTS = [1.0, 2.0, 0.0, 3.0, 4.0, 0.5]
+SAMPLES = ['a', 'b', 'c', 'd', 'e', 'f']
+
+
+def expected_probabilities(weights):
+    total = sum(weights)
+    return [w / total for w in weights]
+
+
+def assert_frequencies(drawn, samples=SAMPLES, weights=WEIGHTS, abs=0.01):
+    """Each sample is drawn about in proportion to its weight, and never if its weight is 0."""
+    counts = Counter(drawn)
+    k = sum(counts.values())
+    for s, w, p in zip(samples, weights, expected_probabilities(weights)):
+        if w == 0:
+            assert counts[s] == 0
+        assert counts[s] / k == pytest.approx(p, abs=abs)
+
+
+@pytest.fixture(autouse=True)
+def seed():
+    random.seed(7)
@@ -0,0 +1,47 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from weighted_selections.src.bench_resampling import main, make_inputs, run_suite, summarize
+
+
+def test_inputs_are_reproducible():
+    samples, weights = make_inputs(100)
+    assert len(samples) == len(weights) == 100
+    assert make_inputs(100) == (samples, weights)
+
+
+def test_summarize():
+    assert summarize([1.0, 2.0, 3.0, 4.0, 5.0]) == (3.0, 2.0)
+    assert summarize([2.0]) == (2.0, 0.0)
+
+
+def test_suite():
+    results = run_suite(['my_choices_fast', 'alias_choices'], sizes=[100, 1000], k_ratios=[0.5, 1.0],
+                        min_time=0.0, trials=3, warmup=0, report=None)
+    assert [(r['algorithm'], r['n'], r['k']) for r in results] == [
+        ('my_choices_fast', 100, 50), ('alias_choices', 100, 50),
+        ('my_choices_fast', 100, 100), ('alias_choices', 100, 100),
+        ('my_choices_fast', 1000, 500), ('alias_choices', 1000, 500),
+        ('my_choices_fast', 1000, 1000), ('alias_choices', 1000, 1000)]
+    for result in results:
+        assert len(result['times']) == 3
+        assert result['min'] <= result['median']
+        assert result['iqr'] >= 0
+
+
+def test_main_writes_json(tmp_path, capsys):
+    output = tmp_path / 'results.json'
+    assert main(['--algorithms', 'numpy_systematic_choices', '--sizes', '10', '--min-time', '0',
+                 '--trials', '2', '--output', str(output)]) == 0
+    results = json.loads(output.read_text())
+    assert [r['algorithm'] for r in results] == ['numpy_systematic_choices']
+    assert 'numpy_systematic_choices' in capsys.readouterr().out
+
+
+def test_matplotlib_is_imported_lazily():
+    code = 'import sys, weighted_selections.src.bench_resampling; print("matplotlib" in sys.modules)'
+    root = Path(__file__).parent.parent.parent
+    assert subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True,
+                          text=True, check=True).stdout.strip() == 'False'
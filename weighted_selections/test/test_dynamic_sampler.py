@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from conftest import SAMPLES, WEIGHTS, assert_frequencies
+from weighted_selections.src.dynamic_sampler import DynamicWeightedSampler
+
+
+def assert_sampler_frequencies(sampler, k=100_000):
+    assert_frequencies(sampler.sample(k), sampler.samples, [sampler.weight(i) for i in range(len(sampler))])
+
+
+def assert_prefix_sums(sampler):
+    acc = 0.0
+    for i in range(len(sampler)):
+        acc += sampler.weight(i)
+        assert sampler._prefix_sum(i + 1) == pytest.approx(acc)
+
+
+def test_sample():
+    sampler = DynamicWeightedSampler(SAMPLES, WEIGHTS)
+    assert len(sampler) == 6
+    assert sampler.total == pytest.approx(10.5)
+    assert_prefix_sums(sampler)
+    assert_sampler_frequencies(sampler)
+
+
+def test_update():
+    sampler = DynamicWeightedSampler(SAMPLES, WEIGHTS)
+    sampler.update(2, 5.0)
+    sampler.update(4, 0.0)
+    assert sampler.total == pytest.approx(11.5)
+    assert_prefix_sums(sampler)
+    assert_sampler_frequencies(sampler)
+    assert 'e' not in sampler.sample(1000)
+
+
+def test_append_and_remove():
+    sampler = DynamicWeightedSampler()
+    for s, w in zip(SAMPLES, WEIGHTS):
+        sampler.append(s, w)
+    assert_prefix_sums(sampler)
+    assert sampler.remove(1) == 'b'
+    assert sampler.samples == ['a', 'f', 'c', 'd', 'e']
+    assert sampler.remove(4) == 'e'
+    assert sampler.total == pytest.approx(4.5)
+    assert_prefix_sums(sampler)
+    assert_sampler_frequencies(sampler)
+
+
+def test_negative_indices():
+    sampler = DynamicWeightedSampler(SAMPLES, WEIGHTS)
+    sampler.update(-1, 5.0)
+    assert sampler.weight(5) == 5.0
+    assert sampler.remove(-2) == 'e'
+    assert sampler.samples == ['a', 'b', 'c', 'd', 'f']
+    assert sampler.total == pytest.approx(11.0)
+    assert_prefix_sums(sampler)
+    with pytest.raises(IndexError):
+        sampler.update(5, 1.0)
+    with pytest.raises(IndexError):
+        sampler.remove(-6)
+
+
+def test_random_operations_keep_the_sums():
+    rng = random.Random(5)
+    sampler = DynamicWeightedSampler()
+    weights = []
+    for _ in range(2000):
+        op = rng.random()
+        if op < 0.5 or not weights:
+            w = rng.random()
+            sampler.append(len(weights), w)
+            weights.append(w)
+        elif op < 0.8:
+            i = rng.randrange(len(weights))
+            weights[i] = rng.random()
+            sampler.update(i, weights[i])
+        else:
+            i = rng.randrange(len(weights))
+            sampler.remove(i)
+            weights[i] = weights[-1]
+            weights.pop()
+    assert list(sampler._weights) == weights
+    assert_prefix_sums(sampler)
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        DynamicWeightedSampler(SAMPLES, WEIGHTS[:-1])
+    with pytest.raises(ValueError):
+        DynamicWeightedSampler(SAMPLES, [-1.0] * 6)
+    with pytest.raises(ValueError):
+        DynamicWeightedSampler(['a'], [0.0]).sample()
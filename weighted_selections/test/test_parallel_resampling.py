@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from conftest import WEIGHTS, assert_frequencies
+from weighted_selections.src.parallel_resampling import *
+
+
+@pytest.fixture(scope='module')
+def resampler():
+    with ParallelResampler(workers=3, rng=np.random.default_rng(17)) as resampler:
+        yield resampler
+
+
+def test_frequencies(resampler):
+    k = 100_000
+    res = resampler(np.arange(len(WEIGHTS)), WEIGHTS, k=k)
+    assert len(res) == k
+    assert list(res) == sorted(res)
+    assert_frequencies(res.tolist(), range(len(WEIGHTS)))
+
+
+def test_more_workers_than_weights(resampler):
+    assert set(resampler(['a', 'b'], [0.0, 1.0], k=10)) == {'b'}
+
+
+def test_parallel_choices():
+    res = parallel_choices(['a', 'b', 'c'], [1.0, 0.0, 1.0], k=1000, workers=2)
+    assert set(res) == {'a', 'c'}
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from weighted_selections.src.particle_filter import *
+from weighted_selections.src.resampling import numpy_choices_fast, systematic_choices
+
+
+def kalman_filter(observations, m, p, q, r):
+    # p is the variance of the prior, q and r are standard deviations
+    for y in observations:
+        p += q * q
+        k = p / (p + r * r)
+        m += k * (y - m)
+        p *= 1 - k
+        yield m, sqrt(p)
+
+
+def make_filter(rng, n=20_000, **kwargs):
+    return ParticleFilter(rng.normal(0.0, 3.0, size=n), random_walk(1.0), gaussian_log_likelihood(3.0),
+                          rng=rng, **kwargs)
+
+
+@pytest.mark.parametrize('resampling', [numpy_systematic_choices, numpy_choices_fast, systematic_choices])
+def test_matches_kalman_filter(resampling):
+    rng = np.random.default_rng(11)
+    observations = np.cumsum(rng.normal(0.0, 1.0, size=50)) + rng.normal(0.0, 3.0, size=50)
+    pf = make_filter(rng, resampling=resampling)
+    for (mean, sigma), (m, s) in zip(pf.run(observations), kalman_filter(observations, 0.0, 9.0, 1.0, 3.0)):
+        assert mean == pytest.approx(m, abs=0.15)
+        assert sigma == pytest.approx(s, abs=0.15)
+
+
+def test_multidimensional_state():
+    # Two independent random walks, each tracked as by its own filter
+    rng = np.random.default_rng(13)
+    observations = np.cumsum(rng.normal(0.0, 1.0, size=(30, 2)), axis=0) + rng.normal(0.0, 3.0, size=(30, 2))
+    log_likelihood = lambda particles, y: gaussian_logpdf(particles, y, 3.0).sum(axis=1)
+    pf = ParticleFilter(rng.normal(0.0, 3.0, size=(20_000, 2)), random_walk(1.0), log_likelihood, rng=rng)
+    estimates = list(pf.run(observations))
+    for d in range(2):
+        for (mean, sigma), (m, s) in zip(estimates, kalman_filter(observations[:, d], 0.0, 9.0, 1.0, 3.0)):
+            assert mean.shape == sigma.shape == (2,)
+            assert mean[d] == pytest.approx(m, abs=0.2)
+            assert sigma[d] == pytest.approx(s, abs=0.2)
+
+
+def test_resampling_is_triggered_by_ess():
+    rng = np.random.default_rng(5)
+    observations = rng.normal(0.0, 3.0, size=20)
+    never = make_filter(rng, n=1000, ess_threshold=0.0)
+    list(never.run(observations))
+    assert never.resample_count == 0
+    always = make_filter(rng, n=1000, ess_threshold=1.01)
+    list(always.run(observations))
+    assert always.resample_count == 20
+
+
+def test_weights_stay_normalized():
+    pf = make_filter(np.random.default_rng(2), n=1000, ess_threshold=0.0)
+    for y in (100.0, -50.0, 3.0):
+        pf.step(y)
+        assert pf.weights.sum() == pytest.approx(1.0)
+        assert 1 <= pf.ess() <= 1000
+
+
+@pytest.mark.parametrize('resampling', [numpy_systematic_choices, numpy_choices_fast])
+def test_seeded_runs_are_reproducible(resampling):
+    def run():
+        rng = np.random.default_rng(3)
+        pf = make_filter(rng, n=2000, resampling=resampling, ess_threshold=1.0)
+        return [mean for mean, _ in pf.run([1.0, -2.0, 0.5, 3.0])]
+
+    assert run() == run()
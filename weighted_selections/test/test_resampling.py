@@ -0,0 +1,109 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from conftest import SAMPLES, WEIGHTS, assert_frequencies, expected_probabilities
+from weighted_selections.src.resampling import *
+
+
+def alias_probabilities(sampler):
+    """The probability of each index, computed from the alias table."""
+    n = len(sampler.prob)
+    p = [0.0] * n
+    for i, (q, a) in enumerate(zip(sampler.prob, sampler.alias)):
+        p[i] += q / n
+        p[a] += (1 - q) / n
+    return p
+
+
+@pytest.mark.parametrize('sampler_class', [AliasSampler, NumpyAliasSampler])
+class TestAliasSampler:
+
+    def test_table(self, sampler_class):
+        sampler = sampler_class(WEIGHTS)
+        assert alias_probabilities(sampler) == pytest.approx(expected_probabilities(WEIGHTS))
+
+    @pytest.mark.parametrize('weights', [[1000.0] + [1.0] * 999, [1.0] * 999 + [500.0, 500.0],
+                                         list(np.random.default_rng(2).random(1000))])
+    def test_table_of_many_weights(self, sampler_class, weights):
+        # A dominant weight leaves a single large slot to pair at each step
+        sampler = sampler_class(weights)
+        assert alias_probabilities(sampler) == pytest.approx(expected_probabilities(weights))
+
+    def test_frequencies(self, sampler_class):
+        sampler = sampler_class()
+        assert_frequencies(sampler(SAMPLES, WEIGHTS, k=100_000))
+
+    def test_table_is_reused(self, sampler_class):
+        sampler = sampler_class()
+        sampler(SAMPLES, WEIGHTS, k=1)
+        table = sampler.prob
+        sampler(SAMPLES, WEIGHTS, k=1)
+        assert sampler.prob is table
+        sampler(SAMPLES, WEIGHTS[:], k=1)
+        assert sampler.prob is not table
+
+
+def test_numpy_alias_sampler_is_reproducible():
+    draw = lambda: NumpyAliasSampler(WEIGHTS, rng=np.random.default_rng(7)).sample_indices(20)
+    assert list(draw()) == list(draw())
+
+
+class TestNumpyChoicesFast:
+
+    def test_frequencies(self):
+        assert_frequencies(numpy_choices_fast(SAMPLES, WEIGHTS, k=100_000, rng=np.random.default_rng(1)))
+
+    def test_sorted_and_reproducible(self):
+        draw = lambda: numpy_choices_fast(list(range(6)), WEIGHTS, k=50, rng=np.random.default_rng(3))
+        res = draw()
+        assert list(res) == sorted(res)
+        assert list(res) == list(draw())
+
+
+SCHEMES = [systematic_choices, stratified_choices, residual_choices,
+           numpy_systematic_choices, numpy_stratified_choices, numpy_residual_choices]
+
+
+@pytest.mark.parametrize('resampling', SCHEMES)
+def test_scheme_frequencies(resampling):
+    k = 100_000
+    res = resampling(SAMPLES, WEIGHTS, k=k)
+    assert len(res) == k
+    assert_frequencies(res)
+
+
+@pytest.mark.parametrize('resampling', [systematic_choices, numpy_systematic_choices,
+                                        residual_choices, numpy_residual_choices])
+def test_low_variance_counts(resampling):
+    # Systematic and residual resampling copy each sample at least floor(k * p) times,
+    # systematic resampling at most ceil(k * p) times
+    k = 37
+    counts = Counter(resampling(SAMPLES, WEIGHTS, k=k))
+    for s, p in zip(SAMPLES, expected_probabilities(WEIGHTS)):
+        assert int(k * p) <= counts[s]
+        if 'systematic' in resampling.__name__:
+            assert counts[s] <= int(k * p) + 1
+
+
+def test_gaussian_logpdf():
+    xs = [-3.0, 0.5, 2.6, 10.0]
+    assert list(gaussian_logpdf(np.array(xs), μ=2.6, σ=3.5)) == pytest.approx(
+        [ln(gaussian_pdf(x, μ=2.6, σ=3.5)) for x in xs])
+    assert gaussian_logpdf(1000.0, σ=1e-3) == pytest.approx(-0.5e12, rel=1e-6)
+
+
+def test_logsumexp():
+    assert logsumexp([0.0, 0.0]) == pytest.approx(ln(2))
+    assert logsumexp([-1000.0, -1000.0]) == pytest.approx(-1000.0 + ln(2))
+    assert logsumexp([1000.0, 0.0]) == pytest.approx(1000.0)
+    assert logsumexp([-np.inf, -np.inf]) == -np.inf
+
+
+@pytest.mark.parametrize('resampling', [systematic_choices, numpy_systematic_choices, my_choices_fast,
+                                        numpy_alias_choices])
+def test_log_resampling_survives_underflow(resampling):
+    # exp of these log-weights underflows to 0 for every sample
+    log_weights = [-2000.0 + ln(w) if w else -np.inf for w in WEIGHTS]
+    assert_frequencies(log_resampling(resampling)(SAMPLES, log_weights, k=50_000), abs=0.015)
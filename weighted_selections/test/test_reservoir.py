@@ -0,0 +1,69 @@
+from collections import Counter
+from itertools import permutations
+
+import pytest
+
+from conftest import SAMPLES, WEIGHTS, assert_frequencies
+from weighted_selections.src.reservoir import WeightedReservoirWithReplacement, reservoir_choices, reservoir_sample
+
+
+def inclusion_probabilities(weights, k):
+    """The probability that each index is in a sample of size k drawn without replacement."""
+    p = [0.0] * len(weights)
+    positive = [i for i, w in enumerate(weights) if w > 0]
+    for draw in permutations(positive, k):
+        q, total = 1.0, sum(weights)
+        for i in draw:
+            q *= weights[i] / total
+            total -= weights[i]
+        for i in draw:
+            p[i] += q
+    return p
+
+
+def test_sample_without_replacement():
+    k, trials = 3, 20_000
+    counts = Counter()
+    for _ in range(trials):
+        res = reservoir_sample(zip(SAMPLES, WEIGHTS), k=k)
+        assert len(res) == k
+        assert len(set(res)) == k
+        counts.update(res)
+    assert counts['c'] == 0
+    for s, p in zip(SAMPLES, inclusion_probabilities(WEIGHTS, k)):
+        assert counts[s] / trials == pytest.approx(p, abs=0.015)
+
+
+def test_sample_of_one_follows_the_weights():
+    assert_frequencies((reservoir_sample(zip(SAMPLES, WEIGHTS))[0] for _ in range(20_000)), abs=0.015)
+
+
+def test_sample_of_a_short_stream():
+    assert sorted(reservoir_sample(zip(SAMPLES, WEIGHTS), k=10)) == ['a', 'b', 'd', 'e', 'f']
+    assert reservoir_sample(iter([]), k=3) == []
+    assert reservoir_sample(zip(SAMPLES, WEIGHTS), k=0) == []
+
+
+def test_sample_of_a_long_stream_with_large_weights():
+    # Keys are kept as logarithms, so large weights do not make them round to 1
+    stream = ((i, 1e6 * (i % 10 + 1)) for i in range(100_000))
+    res = reservoir_sample(stream, k=100)
+    assert len(set(res)) == 100
+    assert sum(i % 10 + 1 for i in res) / 100 == pytest.approx(7.0, abs=0.6)
+
+
+def test_choices_with_replacement():
+    k = 100_000
+    res = reservoir_choices(zip(SAMPLES, WEIGHTS), k=k)
+    assert len(res) == k
+    assert_frequencies(res)
+
+
+def test_choices_of_a_long_stream():
+    reservoir = WeightedReservoirWithReplacement(1000)
+    reservoir.extend((i, 1.0) for i in range(100_000))
+    assert reservoir.total == 100_000
+    res = reservoir.samples()
+    assert len(res) == 1000
+    assert sum(res) / 1000 == pytest.approx(50_000, rel=0.1)
+    assert reservoir_choices(iter([]), k=3) == []
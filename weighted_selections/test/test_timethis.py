@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+
+import pytest
+
+from weighted_selections.src.timethis import LogHistogram, TimingRegistry, timeblock, timethis
+
+
+def test_log_histogram_percentiles():
+    sketch = LogHistogram(accuracy=0.01)
+    for i in range(1, 10_001):
+        sketch.add(i / 1000)
+    assert sketch.count == 10_000
+    for p in (1, 50, 90, 99):
+        assert sketch.percentile(p) == pytest.approx(p / 10, rel=0.02)
+    assert len(sketch.buckets) < 500
+
+
+def test_log_histogram_zeros():
+    sketch = LogHistogram()
+    sketch.add(0.0)
+    sketch.add(0.0)
+    sketch.add(1.0)
+    assert sketch.percentile(50) == 0.0
+    assert sketch.percentile(100) == pytest.approx(1.0, rel=0.01)
+
+
+def test_timethis_records(capsys):
+    registry = TimingRegistry()
+
+    @timethis(echo=False, cpu=True, registry=registry)
+    def f(x):
+        return x + 1
+
+    assert [f(i) for i in range(5)] == [1, 2, 3, 4, 5]
+    assert capsys.readouterr().out == ''
+    stats = registry[f'{__name__}.f']
+    assert stats.count == 5
+    assert stats.min <= stats.total / 5 <= stats.max
+    assert stats.cpu_total is not None
+    assert stats.peak_bytes is None
+
+
+def test_timethis_prints_by_default(capsys):
+    @timethis
+    def g():
+        pass
+
+    g()
+    assert capsys.readouterr().out.startswith(f'{__name__}.g : ')
+
+
+def test_timeblock_records_memory(capsys):
+    registry = TimingRegistry()
+    with timeblock('alloc', memory=True, registry=registry):
+        data = bytearray(1_000_000)
+    del data
+    assert capsys.readouterr().out.startswith('alloc : ')
+    assert registry['alloc'].peak_bytes >= 1_000_000
+
+
+def test_nested_timeblocks_record_memory():
+    registry = TimingRegistry()
+    with timeblock('outer', echo=False, memory=True, registry=registry):
+        data = bytearray(10_000_000)
+        del data
+        with timeblock('inner', echo=False, memory=True, registry=registry):
+            data = bytearray(1_000_000)
+            del data
+        data = bytearray(2_000_000)
+        del data
+    assert 1_000_000 <= registry['inner'].peak_bytes < 2_000_000
+    assert registry['outer'].peak_bytes >= 10_000_000
+
+
+def test_timeblock_records_on_exception():
+    registry = TimingRegistry()
+    with pytest.raises(KeyError):
+        with timeblock('fails', echo=False, registry=registry):
+            raise KeyError
+    assert registry['fails'].count == 1
+
+
+def test_export():
+    registry = TimingRegistry()
+    for _ in range(3):
+        with timeblock('a', echo=False, registry=registry):
+            pass
+    with timeblock('b', echo=False, registry=registry):
+        pass
+    rows = json.loads(registry.to_json())
+    assert [(row['label'], row['count']) for row in rows] == [('a', 3), ('b', 1)]
+    rows = list(csv.DictReader(io.StringIO(registry.to_csv())))
+    assert [(row['label'], row['count']) for row in rows] == [('a', '3'), ('b', '1')]
+    out = io.StringIO()
+    registry.to_json(out)
+    assert json.loads(out.getvalue()) == json.loads(registry.to_json())
+    registry.reset()
+    assert registry.as_dicts() == []